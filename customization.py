@@ -1,6 +1,6 @@
 import pygame
 import os
-from game_engine import Button, SCREEN_WIDTH, SCREEN_HEIGHT
+from game_engine import Button, SCREEN_WIDTH, SCREEN_HEIGHT, render_text
 
 class CustomizationMenu:
     def __init__(self, screen, font_large, font_medium):
@@ -168,7 +168,7 @@ class CustomizationMenu:
         
         # Draw title
         title_text = "Customize Your Game"
-        title_surf = self.font_large.render(title_text, True, (255, 255, 255))
+        title_surf = render_text(self.font_large, title_text, (255, 255, 255))
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 80))
         
         if self.state == "main":
@@ -178,11 +178,11 @@ class CustomizationMenu:
             
             # Draw current selections
             char_text = f"Current Character: {self.current_character.title()}"
-            char_surf = self.font_medium.render(char_text, True, (255, 255, 255))
+            char_surf = render_text(self.font_medium, char_text, (255, 255, 255))
             self.screen.blit(char_surf, (SCREEN_WIDTH//2 - char_surf.get_width()//2, 400))
             
             bg_text = f"Current Background: {self.current_bg_style.title()}"
-            bg_surf = self.font_medium.render(bg_text, True, (255, 255, 255))
+            bg_surf = render_text(self.font_medium, bg_text, (255, 255, 255))
             self.screen.blit(bg_surf, (SCREEN_WIDTH//2 - bg_surf.get_width()//2, 440))
             
             # Draw previews
@@ -196,7 +196,7 @@ class CustomizationMenu:
         elif self.state == "character":
             # Draw character selection menu
             title_text = "Select Character"
-            title_surf = self.font_medium.render(title_text, True, (255, 255, 255))
+            title_surf = render_text(self.font_medium, title_text, (255, 255, 255))
             self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 150))
             
             for button in self.character_buttons:
@@ -217,7 +217,7 @@ class CustomizationMenu:
         elif self.state == "background":
             # Draw background selection menu
             title_text = "Select Background"
-            title_surf = self.font_medium.render(title_text, True, (255, 255, 255))
+            title_surf = render_text(self.font_medium, title_text, (255, 255, 255))
             self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 150))
             
             for button in self.bg_buttons:
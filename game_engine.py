@@ -2,8 +2,12 @@ import pygame
 import sys
 import math
 import random
+import numpy as np
 from enum import Enum
+from collections import OrderedDict
 import os
+import queue
+import threading
 
 # Initialize Pygame
 pygame.init()
@@ -13,8 +17,19 @@ pygame.mixer.init()
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+FIXED_DT = 1.0 / FPS  # Simulation step; physics constants are tuned per step
 TILE_SIZE = 40
 
+# Headless mode: the simulation runs without loading images, sounds or animations
+HEADLESS = False
+
+def set_headless(enabled=True):
+    global HEADLESS
+    HEADLESS = enabled
+
+def is_headless():
+    return HEADLESS
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -47,46 +62,281 @@ class GameState(Enum):
     SETTINGS = 8
     CREDITS = 9
 
+# Asset cache shared by load_image and load_sound
+class AssetCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.entries = OrderedDict()  # key -> (asset, size in bytes)
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, key, asset, size):
+        if key in self.entries:
+            self.bytes_used -= self.entries.pop(key)[1]
+        self.entries[key] = (asset, size)
+        self.bytes_used += size
+        # Evict least recently used assets, but always keep the newest one
+        while self.bytes_used > self.max_bytes and len(self.entries) > 1:
+            _, (_, old_size) = self.entries.popitem(last=False)
+            self.bytes_used -= old_size
+            self.evictions += 1
+    
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry[1]
+    
+    def clear(self):
+        self.entries.clear()
+        self.bytes_used = 0
+    
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.bytes_used,
+            'max_bytes': self.max_bytes
+        }
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def sound_bytes(sound):
+    mixer_info = pygame.mixer.get_init()
+    if not mixer_info or not hasattr(sound, "get_length"):
+        return 0
+    frequency, sample_format, channels = mixer_info
+    return int(sound.get_length() * frequency * channels * abs(sample_format) // 8)
+
+asset_cache = AssetCache()
+
 # Asset loading functions
+def get_image_path(name):
+    # Use absolute path for more reliable loading
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, "assets", "images", name)
+
 def load_image(name, scale=1.0, convert_alpha=True):
+    if HEADLESS:
+        return None
+    key = ("image", name, scale, convert_alpha)
+    image = asset_cache.get(key)
+    if image is not None:
+        return image
+    path = get_image_path(name)
+    print(f"Loading image: {path}")
     try:
-        # Use absolute path for more reliable loading
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(base_path, "assets", "images", name)
-        print(f"Loading image: {path}")
-        
         image = pygame.image.load(path)
+    except pygame.error as e:
+        print(f"Failed to load image: {name}, Error: {e}")
+        # The file can't be read, so cache the placeholder instead of retrying every call
+        image = placeholder_image()
+        asset_cache.put(key, image, surface_bytes(image))
+        return image
+    try:
         if convert_alpha:
             image = image.convert_alpha()
         else:
             image = image.convert()
-        if scale != 1.0:
-            new_size = (int(image.get_width() * scale), int(image.get_height() * scale))
-            image = pygame.transform.scale(image, new_size)
-        print(f"Successfully loaded image: {name}")
-        return image
     except pygame.error as e:
-        print(f"Failed to load image: {name}, Error: {e}")
-        # Create a placeholder image if file not found
-        surf = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-        pygame.draw.rect(surf, (255, 0, 255), (0, 0, TILE_SIZE, TILE_SIZE))
-        pygame.draw.line(surf, BLACK, (0, 0), (TILE_SIZE, TILE_SIZE), 2)
-        pygame.draw.line(surf, BLACK, (TILE_SIZE, 0), (0, TILE_SIZE), 2)
-        return surf
+        # Usually no display mode yet; the file is fine, so don't cache anything and try again next time
+        print(f"Failed to convert image: {name}, Error: {e}")
+        return placeholder_image()
+    if scale != 1.0:
+        new_size = (int(image.get_width() * scale), int(image.get_height() * scale))
+        image = pygame.transform.scale(image, new_size)
+    asset_cache.put(key, image, surface_bytes(image))
+    return image
+
+def placeholder_image():
+    # Magenta tile with a cross, shown in place of images that failed to load
+    image = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+    pygame.draw.rect(image, (255, 0, 255), (0, 0, TILE_SIZE, TILE_SIZE))
+    pygame.draw.line(image, BLACK, (0, 0), (TILE_SIZE, TILE_SIZE), 2)
+    pygame.draw.line(image, BLACK, (TILE_SIZE, 0), (0, TILE_SIZE), 2)
+    return image
 
 def load_sound(name):
+    if HEADLESS:
+        return DummySound()
+    key = ("sound", name)
+    sound = asset_cache.get(key)
+    if sound is not None:
+        return sound
     try:
         base_path = os.path.dirname(os.path.abspath(__file__))
         path = os.path.join(base_path, "assets", "sounds", name)
         print(f"Loading sound: {path}")
         
         sound = pygame.mixer.Sound(path)
-        print(f"Successfully loaded sound: {name}")
-        return sound
     except pygame.error as e:
         print(f"Failed to load sound: {name}, Error: {e}")
         # Return a dummy sound if file not found
-        return DummySound()
+        sound = DummySound()
+    asset_cache.put(key, sound, sound_bytes(sound))
+    return sound
+
+# Fonts by size, shared so the text cache can match strings rendered by different widgets
+fonts = {}
+
+def get_font(size):
+    font = fonts.get(size)
+    if font is None:
+        font = pygame.font.SysFont(None, size)
+        fonts[size] = font
+    return font
+
+# Rendered strings; most UI text is the same every frame, so it is only rendered once
+text_cache = AssetCache(max_bytes=4 * 1024 * 1024)
+
+def render_text(font, text, color, antialias=True):
+    # The returned surface is shared: don't draw on it or change its alpha
+    key = (font, text, color, antialias)
+    surface = text_cache.get(key)
+    if surface is None:
+        surface = font.render(text, antialias, color)
+        text_cache.put(key, surface, surface_bytes(surface))
+    return surface
+
+# Background loader: a worker thread decodes files; the main thread only converts the results
+class AssetPrefetcher:
+    def __init__(self):
+        self.requests = queue.Queue()
+        self.results = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.generation = 0  # Bumped by clear(); results of older requests are dropped
+    
+    def request(self, key, loader, *args):
+        with self.lock:
+            if key in self.results or key in self.pending:
+                return
+            self.pending.add(key)
+            generation = self.generation
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.worker, daemon=True)
+            self.thread.start()
+        self.requests.put((key, loader, args, generation))
+    
+    def worker(self):
+        while True:
+            key, loader, args, generation = self.requests.get()
+            try:
+                result = loader(*args)
+            except Exception as e:
+                print(f"Failed to prefetch {key}: {e}")
+                result = None
+            with self.lock:
+                self.pending.discard(key)
+                if generation == self.generation:
+                    self.results[key] = result
+    
+    def take(self, key):
+        # Returns the decoded result, or None if it isn't ready (or failed)
+        with self.lock:
+            return self.results.pop(key, None)
+    
+    def clear(self):
+        # Drops finished results and any that are still loading
+        with self.lock:
+            self.results.clear()
+            self.generation += 1
+
+def decode_image(path, size=None):
+    # Safe to run off the main thread: no convert(), which needs the display
+    image = pygame.image.load(path)
+    if size and image.get_size() != size:
+        image = pygame.transform.scale(image, size)
+    return image
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+# Level backgrounds, converted to display format and scaled to the screen once per (style, level)
+class BackgroundCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.cache = AssetCache(max_bytes)
+    
+    def get_path(self, style, level_index):
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        if style != "default":
+            name = f"background_{style}_{level_index + 1}.png"
+        else:
+            name = f"background_{level_index + 1}.png"
+        return os.path.join(base_path, "assets", "images", name)
+    
+    def get(self, style, level_index):
+        key = (style, level_index)
+        background = self.cache.get(key)
+        if background is None:
+            background = False  # Remember missing backgrounds too
+            path = self.get_path(style, level_index)
+            if os.path.exists(path):
+                try:
+                    print(f"Loading level background: {path}")
+                    background = self.prepare(pygame.image.load(path))
+                except pygame.error as e:
+                    print(f"Failed to load level background: {e}")
+            self.store(style, level_index, background)
+        return background or None
+    
+    def prepare(self, image):
+        image = image.convert()
+        if image.get_size() != (SCREEN_WIDTH, SCREEN_HEIGHT):
+            image = pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        return image
+    
+    def store(self, style, level_index, background):
+        size = surface_bytes(background) if background else 0
+        self.cache.put((style, level_index), background, size)
+    
+    def invalidate_style(self, style):
+        for key in [key for key in self.cache.entries if key[0] == style]:
+            self.cache.remove(key)
+
+# Tile atlas: each (image, size) is scaled once and shared by every tile using it
+class TileAtlas:
+    def __init__(self):
+        self.surfaces = []
+        self.indices = {}  # (name, width, height) -> index into surfaces
+    
+    def get_index(self, name, width, height):
+        key = (name, width, height)
+        index = self.indices.get(key)
+        if index is None:
+            image = load_image(name)
+            if image is None:
+                return None
+            if image.get_size() != (width, height):
+                image = pygame.transform.scale(image, (width, height))
+            index = len(self.surfaces)
+            self.surfaces.append(image)
+            self.indices[key] = index
+        return index
+    
+    def get_surface(self, index):
+        return self.surfaces[index]
+    
+    def clear(self):
+        self.surfaces = []
+        self.indices = {}
+
+tile_atlas = TileAtlas()
 
 class DummySound:
     def play(self):
@@ -96,18 +346,31 @@ class DummySound:
         pass
 
 # Animation class
+# Immutable frames that several Animations can share; the mirrored copies are made on first use
+class FrameStrip:
+    def __init__(self, frames):
+        self.frames = tuple(frames)
+        self.flipped_frames = None
+    
+    def get_flipped(self):
+        if self.flipped_frames is None:
+            self.flipped_frames = tuple(pygame.transform.flip(frame, True, False) for frame in self.frames)
+        return self.flipped_frames
+
+# Playback position in a FrameStrip (or a plain list of frames)
 class Animation:
     def __init__(self, frames, frame_duration=5, loop=True):
-        self.frames = frames
+        self.strip = frames if isinstance(frames, FrameStrip) else FrameStrip(frames)
+        self.frames = self.strip.frames
         self.frame_duration = frame_duration
         self.loop = loop
         self.current_frame = 0
         self.frame_counter = 0
         self.finished = False
     
-    def update(self):
+    def update(self, flipped=False):
         if self.finished:
-            return self.frames[-1]
+            return self.get_frame(flipped)
             
         self.frame_counter += 1
         if self.frame_counter >= self.frame_duration:
@@ -120,61 +383,203 @@ class Animation:
                     self.current_frame = len(self.frames) - 1
                     self.finished = True
         
-        return self.frames[self.current_frame]
+        return self.get_frame(flipped)
+    
+    def get_frame(self, flipped=False):
+        if not flipped:
+            return self.frames[self.current_frame]
+        return self.strip.get_flipped()[self.current_frame]
     
     def reset(self):
         self.current_frame = 0
         self.frame_counter = 0
         self.finished = False
 
-# Particle system
+# Pre-rendered alpha circles used to draw particles, keyed by (size, color, alpha bucket)
+PARTICLE_ALPHA_BUCKETS = 16
+particle_stamps = {}
+
+def get_particle_stamp(size, color, alpha_bucket):
+    key = (size, color, alpha_bucket)
+    stamp = particle_stamps.get(key)
+    if stamp is None:
+        alpha = (alpha_bucket + 1) * 256 // PARTICLE_ALPHA_BUCKETS - 1
+        stamp = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(stamp, (*color, alpha), (size, size), size)
+        particle_stamps[key] = stamp
+    return stamp
+
+# Rotated copies of an image at fixed angle steps, keyed by the caller (e.g. portal type).
+# Each frame comes with the offset that puts its centre on the draw position.
+ROTATION_STEPS = 72
+rotation_frames = {}
+
+def get_rotation_frames(key, image, steps=ROTATION_STEPS):
+    frames = rotation_frames.get(key)
+    if frames is None:
+        frames = []
+        for i in range(steps):
+            rotated = pygame.transform.rotate(image, i * 360 / steps)
+            frames.append((rotated, (-(rotated.get_width() // 2), -(rotated.get_height() // 2))))
+        rotation_frames[key] = frames
+    return frames
+
+# Bob and pulse of collectibles and powerups, tabulated by animation timer.
+# Timers count 0-359 but can start at 360 (randint is inclusive), hence the extra entry.
+ANIMATION_STEPS = 361
+BOB_OFFSETS = [math.floor(math.sin(t / 30) * 3 + 0.5) for t in range(ANIMATION_STEPS)]
+PULSE_SCALES = [1.0 + math.sin(t / 15) * 0.1 for t in range(ANIMATION_STEPS)]
+pulse_frames = {}
+
+def get_pulse_frames(key, image):
+    # One entry per timer value: the scaled image and the offset from the draw centre, bob included.
+    # The pulse only hits a handful of pixel sizes, so each size is scaled once and shared.
+    frames = pulse_frames.get(key)
+    if frames is None:
+        width, height = image.get_size()
+        scaled = {}
+        frames = []
+        for t in range(ANIMATION_STEPS):
+            size = (int(width * PULSE_SCALES[t]), int(height * PULSE_SCALES[t]))
+            if size not in scaled:
+                scaled[size] = pygame.transform.scale(image, size)
+            frames.append((scaled[size], (-(size[0] // 2), BOB_OFFSETS[t] - size[1] // 2)))
+        pulse_frames[key] = frames
+    return frames
+
+# Particle system: particles live in preallocated NumPy arrays (structure of arrays)
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
+    def __init__(self, capacity=256, seed=None):
+        self.count = 0
+        self.capacity = 0
+        self.positions = None
+        self.velocities = None
+        self.lifetimes = None
+        self.max_lifetimes = None
+        self.sizes = None
+        self.colors = None
+        self.gravities = None
+        self.rng = np.random.default_rng(seed)
+        self.allocate(capacity)
+    
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+    
+    def allocate(self, capacity):
+        def grow(old, shape, dtype):
+            new = np.zeros(shape, dtype)
+            if old is not None:
+                new[:self.count] = old[:self.count]
+            return new
+        self.positions = grow(self.positions, (capacity, 2), np.float64)
+        self.velocities = grow(self.velocities, (capacity, 2), np.float64)
+        self.lifetimes = grow(self.lifetimes, capacity, np.float64)
+        self.max_lifetimes = grow(self.max_lifetimes, capacity, np.float64)
+        self.sizes = grow(self.sizes, capacity, np.int32)
+        self.colors = grow(self.colors, (capacity, 3), np.uint8)
+        self.gravities = grow(self.gravities, capacity, np.float64)
+        self.capacity = capacity
+    
+    def arrays(self):
+        return (self.positions, self.velocities, self.lifetimes, self.max_lifetimes,
+                self.sizes, self.colors, self.gravities)
+    
+    def emit(self, positions, velocities, lifetimes, sizes, color, gravity=0.1):
+        amount = len(lifetimes)
+        if self.count + amount > self.capacity:
+            self.allocate(max(self.count + amount, self.capacity * 2))
+        start, end = self.count, self.count + amount
+        self.positions[start:end] = positions
+        self.velocities[start:end] = velocities
+        self.lifetimes[start:end] = lifetimes
+        self.max_lifetimes[start:end] = lifetimes
+        self.sizes[start:end] = sizes
+        self.colors[start:end] = color[:3]
+        self.gravities[start:end] = gravity
+        self.count = end
     
     def add_particle(self, x, y, color, velocity_x, velocity_y, lifetime, size=3, gravity=0.1):
-        self.particles.append({
-            'x': x,
-            'y': y,
-            'color': color,
-            'velocity_x': velocity_x,
-            'velocity_y': velocity_y,
-            'lifetime': lifetime,
-            'max_lifetime': lifetime,
-            'size': size,
-            'gravity': gravity
-        })
+        self.emit((x, y), (velocity_x, velocity_y), [lifetime], size, color, gravity)
     
     def create_explosion(self, x, y, color, count=20, speed=3):
-        for _ in range(count):
-            angle = random.uniform(0, math.pi * 2)
-            speed_val = random.uniform(1, speed)
-            velocity_x = math.cos(angle) * speed_val
-            velocity_y = math.sin(angle) * speed_val
-            lifetime = random.randint(20, 40)
-            size = random.randint(2, 5)
-            self.add_particle(x, y, color, velocity_x, velocity_y, lifetime, size)
+        angles = self.rng.uniform(0, math.pi * 2, count)
+        speeds = self.rng.uniform(1, speed, count)
+        velocities = np.column_stack((np.cos(angles) * speeds, np.sin(angles) * speeds))
+        lifetimes = self.rng.integers(20, 41, count)
+        sizes = self.rng.integers(2, 6, count)
+        self.emit((x, y), velocities, lifetimes, sizes, color)
     
     def update(self):
-        for particle in self.particles[:]:
-            particle['x'] += particle['velocity_x']
-            particle['y'] += particle['velocity_y']
-            particle['velocity_y'] += particle['gravity']
-            particle['lifetime'] -= 1
-            
-            if particle['lifetime'] <= 0:
-                self.particles.remove(particle)
+        count = self.count
+        if count == 0:
+            return
+        self.positions[:count] += self.velocities[:count]
+        self.velocities[:count, 1] += self.gravities[:count]
+        self.lifetimes[:count] -= 1
+        
+        # Swap-remove dead particles: live particles from the tail fill the holes
+        dead = np.flatnonzero(self.lifetimes[:count] <= 0)
+        if dead.size:
+            live_count = count - dead.size
+            holes = dead[dead < live_count]
+            if holes.size:
+                movers = np.flatnonzero(self.lifetimes[live_count:count] > 0) + live_count
+                for array in self.arrays():
+                    array[holes] = array[movers]
+            self.count = live_count
     
-    def draw(self, screen):
-        for particle in self.particles:
-            alpha = int(255 * (particle['lifetime'] / particle['max_lifetime']))
-            color = list(particle['color'])
-            if len(color) == 3:
-                color.append(alpha)
-            else:
-                color[3] = alpha
-            
-            pygame.draw.circle(screen, color, (int(particle['x']), int(particle['y'])), particle['size'])
+    def __len__(self):
+        return self.count
+    
+    def draw(self, screen, offset=(0, 0)):
+        # Returns the number of particles drawn; off-screen particles are skipped
+        count = self.count
+        if count == 0:
+            return 0
+        screen_width, screen_height = screen.get_size()
+        positions = (self.positions[:count] - offset).astype(np.int32)
+        sizes = self.sizes[:count]
+        visible = ((positions[:, 0] >= -sizes) & (positions[:, 0] < screen_width + sizes) &
+                   (positions[:, 1] >= -sizes) & (positions[:, 1] < screen_height + sizes))
+        indices = np.flatnonzero(visible)
+        if indices.size == 0:
+            return 0
+        
+        # Group particles by stamp so each (size, color, alpha bucket) is looked up once
+        sizes = sizes[indices].astype(np.int64)
+        colors = self.colors[indices].astype(np.int64)
+        alphas = (255 * self.lifetimes[indices] / self.max_lifetimes[indices]).astype(np.int64)
+        buckets = np.clip(alphas * PARTICLE_ALPHA_BUCKETS // 256, 0, PARTICLE_ALPHA_BUCKETS - 1)
+        rgb = (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+        codes = ((sizes * PARTICLE_ALPHA_BUCKETS + buckets) << 24) | rgb
+        unique_codes, stamp_indices = np.unique(codes, return_inverse=True)
+        stamps = []
+        for code in unique_codes.tolist():
+            rgb_code = code & 0xFFFFFF
+            color = (rgb_code >> 16, (rgb_code >> 8) & 0xFF, rgb_code & 0xFF)
+            size, bucket = divmod(code >> 24, PARTICLE_ALPHA_BUCKETS)
+            stamps.append(get_particle_stamp(size, color, bucket))
+        topleft = positions[indices] - sizes[:, None]
+        screen.blits([(stamps[i], pos) for i, pos in zip(stamp_indices.tolist(), topleft.tolist())], False)
+        return len(indices)
+
+# Fixed-timestep accumulator: turns variable frame times into whole simulation steps
+class FixedTimestep:
+    def __init__(self, dt=FIXED_DT, max_steps=5):
+        self.dt = dt
+        self.max_steps = max_steps  # Cap so a stalled frame doesn't snowball
+        self.accumulator = 0.0
+    
+    def advance(self, frame_time):
+        self.accumulator += min(frame_time, self.dt * self.max_steps)
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+        return steps
+    
+    @property
+    def alpha(self):
+        # How far rendering is between the last two simulation states
+        return self.accumulator / self.dt
 
 # Camera class for smooth following
 class Camera:
@@ -185,8 +590,12 @@ class Camera:
         self.target_x = 0
         self.target_y = 0
         self.smoothness = 0.1  # Lower = smoother
+        self.prev_x = 0  # Position before the last update, for render interpolation
+        self.prev_y = 0
     
     def update(self, target_x, target_y):
+        self.prev_x = self.rect.x
+        self.prev_y = self.rect.y
         self.target_x = target_x - self.width // 2
         self.target_y = target_y - self.height // 2
         
@@ -198,9 +607,114 @@ class Camera:
         # self.rect.x = max(0, min(self.rect.x, level_width - self.width))
         # self.rect.y = max(0, min(self.rect.y, level_height - self.height))
     
+    def interpolated(self, alpha):
+        # Copy placed between the last two updates, so the view moves as smoothly as the player
+        camera = Camera(self.width, self.height)
+        camera.rect.x = int(self.prev_x + (self.rect.x - self.prev_x) * alpha)
+        camera.rect.y = int(self.prev_y + (self.rect.y - self.prev_y) * alpha)
+        return camera
+    
     def apply(self, entity_rect):
         return pygame.Rect(entity_rect.x - self.rect.x, entity_rect.y - self.rect.y, entity_rect.width, entity_rect.height)
 
+# Spatial hash: buckets objects by kind and by the grid cells their rect overlaps
+class SpatialHash:
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}         # (kind, cell_x, cell_y) -> list of objects
+        self.object_cells = {}  # object -> (kind, list of cell keys)
+        self.kind_counts = {}
+    
+    def cell_range(self, rect):
+        size = self.cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+    
+    def insert(self, obj, kind):
+        left, top, right, bottom = self.cell_range(obj.rect)
+        keys = []
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                key = (kind, cell_x, cell_y)
+                self.cells.setdefault(key, []).append(obj)
+                keys.append(key)
+        self.object_cells[obj] = (kind, keys)
+        self.kind_counts[kind] = self.kind_counts.get(kind, 0) + 1
+    
+    def remove(self, obj):
+        entry = self.object_cells.pop(obj, None)
+        if entry is None:
+            return False
+        kind, keys = entry
+        for key in keys:
+            bucket = self.cells[key]
+            bucket.remove(obj)
+            if not bucket:
+                del self.cells[key]
+        self.kind_counts[kind] -= 1
+        return True
+    
+    def move(self, obj):
+        # Re-bucket an object whose rect changed; cheap when it stays in the same cells
+        entry = self.object_cells.get(obj)
+        if entry is None:
+            return
+        kind, keys = entry
+        left, top, right, bottom = self.cell_range(obj.rect)
+        first, last = keys[0], keys[-1]
+        if first[1] == left and first[2] == top and last[1] == right and last[2] == bottom:
+            return
+        self.remove(obj)
+        self.insert(obj, kind)
+    
+    def query(self, rect, kind):
+        if not self.kind_counts.get(kind):
+            return []
+        size = self.cell_size
+        left = rect.left // size
+        right = (rect.right - 1) // size
+        cells = self.cells
+        found = []
+        seen = set()
+        for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for cell_x in range(left, right + 1):
+                bucket = cells.get((kind, cell_x, cell_y))
+                if not bucket:
+                    continue
+                for obj in bucket:
+                    if obj not in seen:
+                        seen.add(obj)
+                        if obj.rect.colliderect(rect):
+                            found.append(obj)
+        return found
+    
+    def __contains__(self, obj):
+        return obj in self.object_cells
+    
+    def count(self, kind):
+        return self.kind_counts.get(kind, 0)
+    
+    def objects(self, kind):
+        return [obj for obj, (obj_kind, _) in self.object_cells.items() if obj_kind == kind]
+
+def sweep_axis(rect, delta, axis, target):
+    # Move rect by delta along one axis (0 = x, 1 = y) against a still target rect.
+    # Returns (time of impact in [0, 1), normal sign) if an edge of target is crossed, else None.
+    # Overlaps that existed before the move are not hits; callers resolve those separately.
+    if delta == 0:
+        return None
+    if axis == 0:
+        if rect.bottom <= target.top or rect.top >= target.bottom:
+            return None
+        gap = target.left - rect.right if delta > 0 else rect.left - target.right
+    else:
+        if rect.right <= target.left or rect.left >= target.right:
+            return None
+        gap = target.top - rect.bottom if delta > 0 else rect.top - target.bottom
+    distance = abs(delta)
+    if gap < 0 or gap >= distance:
+        return None
+    return gap / distance, -1 if delta > 0 else 1
+
 # Button class for UI
 class Button:
     def __init__(self, x, y, width, height, text, color=(100, 100, 100), hover_color=(150, 150, 150), text_color=WHITE):
@@ -210,7 +724,7 @@ class Button:
         self.hover_color = hover_color
         self.text_color = text_color
         self.is_hovered = False
-        self.font = pygame.font.SysFont(None, 32)
+        self.font = get_font(32)
     
     def update(self, mouse_pos):
         self.is_hovered = self.rect.collidepoint(mouse_pos)
@@ -220,7 +734,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, WHITE, self.rect, 2)  # Border
         
-        text_surf = self.font.render(self.text, True, self.text_color)
+        text_surf = render_text(self.font, self.text, self.text_color)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
     
@@ -243,7 +757,9 @@ class TextEffect:
         self.duration = duration
         self.velocity_y = velocity_y
         self.alpha = 255
-        self.font = pygame.font.SysFont(None, size)
+        self.font = get_font(size)
+        # Rendered once and kept by this effect alone, since drawing changes its alpha
+        self.surface = self.font.render(text, True, color)
     
     def update(self):
         self.y += self.velocity_y
@@ -252,9 +768,8 @@ class TextEffect:
         return self.duration > 0
     
     def draw(self, screen):
-        text_surf = self.font.render(self.text, True, self.color)
-        text_surf.set_alpha(self.alpha)
-        screen.blit(text_surf, (self.x - text_surf.get_width() // 2, self.y))
+        self.surface.set_alpha(self.alpha)
+        screen.blit(self.surface, (self.x - self.surface.get_width() // 2, self.y))
 
 # Background parallax effect
 class ParallaxBackground:
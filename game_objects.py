@@ -3,13 +3,18 @@ import math
 import random
 import os
 from enum import Enum
-from game_engine import Dimension, load_image, load_sound, Animation, ParticleSystem, TILE_SIZE
+from game_engine import Dimension, load_image, load_sound, Animation, FrameStrip, ParticleSystem, TILE_SIZE, tile_atlas, is_headless, sweep_axis, get_rotation_frames, BOB_OFFSETS, PULSE_SCALES, get_pulse_frames
+
+# Animation frames per (character, width, height), sliced once and shared by every Player
+character_frames = {}
 
 # Player class
 class Player:
-    def __init__(self, x, y):
+    def __init__(self, x, y, character_type="default"):
         self.x = x
         self.y = y
+        self.prev_x = x  # Position before the last update, for render interpolation
+        self.prev_y = y
         self.width = TILE_SIZE - 4
         self.height = TILE_SIZE - 4
         self.vel_x = 0
@@ -22,6 +27,7 @@ class Player:
         self.dimension = Dimension.NORMAL
         self.ethereal_objects = []  # Objects player can pass through in ethereal dimension
         self.metal_objects = []     # Objects player is attracted to in magnetic dimension
+        self.spatial_index = None   # Level spatial hash used to narrow collision checks
         self.shift_cooldown = 0
         self.health = 100
         self.max_health = 100
@@ -32,7 +38,8 @@ class Player:
         self.is_falling = False
         self.is_idle = True
         self.particle_system = ParticleSystem()
-        self.character_type = "default"  # Can be "default", "mario", "ninja", "robot"
+        self.draw_stats = {'drawn': 0, 'culled': 0}  # Particles drawn vs. culled last frame
+        self.character_type = character_type  # Can be "default", "mario", "ninja", "robot"
         # Load sounds
         self.jump_sound = load_sound("jump.wav")
         self.collect_sound = load_sound("collect.wav")
@@ -44,6 +51,18 @@ class Player:
         self.current_animation = "idle_normal"
     
     def load_animations(self):
+        if is_headless():
+            return
+        key = (self.character_type, self.width, self.height)
+        strips = character_frames.get(key)
+        if strips is None:
+            strips = self.build_animation_frames()
+            character_frames[key] = strips
+        # Each Player only gets its own playback positions
+        self.animations = {name: Animation(strip, 8) for name, strip in strips.items()}
+    
+    def build_animation_frames(self):
+        strips = {}
         dimensions = ["normal", "inverse", "ethereal", "time", "magnetic"]
         states = ["idle", "run", "jump", "fall"]
         try:
@@ -63,9 +82,9 @@ class Player:
                             frame = pygame.Surface((40, 40), pygame.SRCALPHA)
                             frame.blit(character_sheet, (0, 0), (x, y, 40, 40))
                             frames.append(frame)
-                        self.animations[key] = Animation(frames, 8)
+                        strips[key] = FrameStrip(frames)
                 print(f"Successfully loaded {self.character_type} animations")
-                return
+                return strips
         except Exception as e:
             print(f"Failed to load character sprite sheet: {e}")
         # Fallback: try to load individual animation files or use colored rectangles
@@ -78,7 +97,7 @@ class Player:
                         frame_path = f"player/{self.character_type}_{key}_{i}.png"
                         frames.append(load_image(frame_path))
                     if frames:
-                        self.animations[key] = Animation(frames, 8)
+                        strips[key] = FrameStrip(frames)
                         continue
                 except Exception as e:
                     print(f"Failed to load animation {frame_path}: {e}")
@@ -88,7 +107,7 @@ class Player:
                         frame_path = f"player/{key}_{i}.png"
                         frames.append(load_image(frame_path))
                     if frames:
-                        self.animations[key] = Animation(frames, 8)
+                        strips[key] = FrameStrip(frames)
                         continue
                 except Exception as e:
                     print(f"Failed to load animation {frame_path}: {e}")
@@ -111,11 +130,11 @@ class Player:
                     elif state == "fall":
                         pygame.draw.ellipse(surf, (0, 0, 0), (self.width//4, self.height-6, self.width//2, 4))
                     frames.append(surf)
-                self.animations[key] = Animation(frames, 8)
+                strips[key] = FrameStrip(frames)
+        return strips
     
     def change_character(self, character_type):
         self.character_type = character_type
-        self.animations = {}
         self.load_animations()
     
     def get_dimension_color(self, dimension_name):
@@ -154,6 +173,8 @@ class Player:
             hazards = []
         if powerups is None:
             powerups = []
+        self.prev_x = self.x
+        self.prev_y = self.y
         if self.dimension == Dimension.NORMAL:
             gravity = 0.5
             self.max_vel_x = 6
@@ -178,10 +199,12 @@ class Player:
         self.vel_x *= self.friction
         if abs(self.vel_x) < 0.1:
             self.vel_x = 0
+        start_x = self.x
         self.x += self.vel_x
-        self.check_collision_x(walls, platforms)
+        self.check_collision_x(walls, platforms, start_x)
+        start_y = self.y
         self.y += self.vel_y
-        self.check_collision_y(walls, platforms)
+        self.check_collision_y(walls, platforms, start_y)
         if self.vel_x > 0:
             self.facing_right = True
         elif self.vel_x < 0:
@@ -195,6 +218,17 @@ class Player:
         else:
             self.is_jumping = False
             self.is_falling = False
+        index = self.spatial_index
+        if index is not None:
+            # Only test objects in the grid cells the player overlaps
+            player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
+            dimension_portals = index.query(player_rect, "dimension_portals")
+            nearby_collectibles = index.query(player_rect, "collectibles")
+            hazards = index.query(player_rect, "hazards")
+            nearby_powerups = index.query(player_rect, "powerups")
+        else:
+            nearby_collectibles = collectibles[:]
+            nearby_powerups = powerups[:]
         for portal in dimension_portals:
             if self.collides_with(portal) and self.shift_cooldown <= 0:
                 old_dimension = self.dimension
@@ -207,9 +241,11 @@ class Player:
                     self.get_dimension_color(self.dimension.name.lower()),
                     30, 4
                 )
-        for collectible in collectibles[:]:
+        for collectible in nearby_collectibles:
             if self.collides_with(collectible):
                 collectibles.remove(collectible)
+                if index is not None:
+                    index.remove(collectible)
                 self.score += collectible.value
                 self.collect_sound.play()
                 self.particle_system.create_explosion(
@@ -227,9 +263,11 @@ class Player:
                     else:
                         self.vel_x = 5
                     self.vel_y = -5
-        for powerup in powerups[:]:
+        for powerup in nearby_powerups:
             if self.collides_with(powerup):
                 powerups.remove(powerup)
+                if index is not None:
+                    index.remove(powerup)
                 powerup.apply_effect(self)
         if self.shift_cooldown > 0:
             self.shift_cooldown -= 1
@@ -248,10 +286,32 @@ class Player:
                 self.vel_x += (dx / distance) * force
                 self.vel_y += (dy / distance) * force
     
-    def check_collision_x(self, walls, platforms):
+    def check_collision_x(self, walls, platforms, start_x=None):
+        # Sweep from start_x to the current x so fast moves can't skip past a wall
+        start_rect = pygame.Rect(self.x if start_x is None else start_x, self.y, self.width, self.height)
         player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        delta = player_rect.x - start_rect.x
+        if self.spatial_index is not None:
+            walls = self.spatial_index.query(start_rect.union(player_rect), "walls")
+        passes_ethereal = self.dimension == Dimension.ETHEREAL
+        hit = None
+        for wall in walls:
+            if passes_ethereal and wall.is_ethereal:
+                continue
+            impact = sweep_axis(start_rect, delta, 0, wall.rect)
+            if impact and (hit is None or impact[0] < hit[0][0]):
+                hit = (impact, wall)
+        if hit:
+            (time, normal), wall = hit
+            if normal < 0:
+                self.x = wall.rect.left - self.width
+            else:
+                self.x = wall.rect.right
+            self.vel_x = 0
+            player_rect.x = self.x
+        # Walls the player was already inside, e.g. after leaving the ethereal dimension
         for wall in walls:
-            if self.dimension == Dimension.ETHEREAL and wall in self.ethereal_objects:
+            if passes_ethereal and wall.is_ethereal:
                 continue
             if player_rect.colliderect(wall.rect):
                 if self.vel_x > 0:
@@ -260,11 +320,55 @@ class Player:
                     self.x = wall.rect.right
                 self.vel_x = 0
     
-    def check_collision_y(self, walls, platforms):
+    def check_collision_y(self, walls, platforms, start_y=None):
         self.can_jump = False
+        start_rect = pygame.Rect(self.x, self.y if start_y is None else start_y, self.width, self.height)
         player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        delta = player_rect.y - start_rect.y
+        if self.spatial_index is not None:
+            swept_rect = start_rect.union(player_rect)
+            walls = self.spatial_index.query(swept_rect, "walls")
+            platforms = (self.spatial_index.query(swept_rect, "platforms") +
+                         self.spatial_index.query(swept_rect, "moving_platforms"))
+        passes_ethereal = self.dimension == Dimension.ETHEREAL
+        hit = None
         for wall in walls:
-            if self.dimension == Dimension.ETHEREAL and wall in self.ethereal_objects:
+            if passes_ethereal and wall.is_ethereal:
+                continue
+            impact = sweep_axis(start_rect, delta, 1, wall.rect)
+            if impact and (hit is None or impact[0] < hit[0][0]):
+                hit = (impact, wall.rect, False)
+        # Platforms are one-way: landed on from above in normal gravity, from below in inverse
+        if ((self.dimension == Dimension.NORMAL and self.vel_y > 0) or
+                (self.dimension == Dimension.INVERSE and self.vel_y < 0)):
+            for platform in platforms:
+                # Sweep against where a moving platform was, relative to how far it moved
+                before = getattr(platform, "prev_rect", platform.rect)
+                if start_rect.colliderect(before):
+                    # Already inside it; the overlap check below decides, as it always has
+                    continue
+                relative_delta = delta - (platform.rect.y - before.y)
+                if (relative_delta > 0) != (self.vel_y > 0):
+                    continue
+                impact = sweep_axis(start_rect, relative_delta, 1, before)
+                if impact and (hit is None or impact[0] < hit[0][0]):
+                    hit = (impact, platform.rect, True)
+        if hit:
+            (time, normal), rect, is_platform = hit
+            if normal < 0:
+                self.y = rect.top - self.height
+                self.can_jump = True
+                self.is_falling = False
+            else:
+                self.y = rect.bottom
+                if is_platform:
+                    self.can_jump = True
+                    self.is_falling = False
+            self.vel_y = 0
+            player_rect.y = self.y
+        # Walls the player was already inside
+        for wall in walls:
+            if passes_ethereal and wall.is_ethereal:
                 continue
             if player_rect.colliderect(wall.rect):
                 if self.vel_y > 0:
@@ -274,6 +378,7 @@ class Player:
                 elif self.vel_y < 0:
                     self.y = wall.rect.bottom
                 self.vel_y = 0
+        # Platforms the player overlaps while moving toward them snap the player onto them
         for platform in platforms:
             if player_rect.colliderect(platform.rect):
                 if self.dimension == Dimension.NORMAL and self.vel_y > 0:
@@ -334,51 +439,57 @@ class Player:
         player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
         return player_rect.colliderect(obj.rect)
     
-    def draw(self, screen, camera=None):
-        # Get current animation frame
+    def draw(self, screen, camera=None, alpha=1.0):
+        # alpha blends between the previous and current simulation positions
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        # Get current animation frame, mirrored if facing left
         if self.current_animation in self.animations:
-            current_frame = self.animations[self.current_animation].update()
+            current_frame = self.animations[self.current_animation].update(not self.facing_right)
         else:
             # Fallback if animation not found
-            current_frame = self.animations["idle_normal"].update()
-        
-        # Flip if facing left
-        if not self.facing_right:
-            current_frame = pygame.transform.flip(current_frame, True, False)
+            current_frame = self.animations["idle_normal"].update(not self.facing_right)
         
         # Draw with or without camera
         if camera:
-            rect = camera.apply(pygame.Rect(self.x, self.y, self.width, self.height))
-            screen.blit(current_frame, rect)
+            rect = camera.apply(pygame.Rect(x, y, self.width, self.height))
+            if screen.get_rect().colliderect(rect):
+                screen.blit(current_frame, rect)
             
-            # Draw particles with camera offset
-            for particle in self.particle_system.particles:
-                pos = (int(particle['x'] - camera.rect.x), int(particle['y'] - camera.rect.y))
-                pygame.draw.circle(screen, particle['color'], pos, particle['size'])
+            # Draw on-screen particles with camera offset
+            drawn = self.particle_system.draw(screen, (camera.rect.x, camera.rect.y))
+            self.draw_stats['drawn'] = drawn
+            self.draw_stats['culled'] = len(self.particle_system) - drawn
         else:
-            screen.blit(current_frame, (self.x, self.y))
+            screen.blit(current_frame, (x, y))
             self.particle_system.draw(screen)
         
         # Flash when invincible
         if self.invincible > 0 and self.invincible % 6 < 3:
             if camera:
-                rect = camera.apply(pygame.Rect(self.x, self.y, self.width, self.height))
+                rect = camera.apply(pygame.Rect(x, y, self.width, self.height))
                 pygame.draw.rect(screen, (255, 255, 255, 128), rect, 2)
             else:
-                pygame.draw.rect(screen, (255, 255, 255, 128), (self.x, self.y, self.width, self.height), 2)
+                pygame.draw.rect(screen, (255, 255, 255, 128), (x, y, self.width, self.height), 2)
 
 # Wall class
 class Wall:
+    image_name = "wall.png"
     def __init__(self, x, y, width, height, color=(255, 255, 255)):
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
         self.is_ethereal = False
         self.is_metal = False
+        # Tiles only keep an index into the shared atlas, not their own surface
         try:
-            self.image = load_image("wall.png")
-            self.image = pygame.transform.scale(self.image, (width, height))
+            self.tile_index = tile_atlas.get_index(self.image_name, width, height)
         except:
-            self.image = None
+            self.tile_index = None
+    @property
+    def image(self):
+        if self.tile_index is None:
+            return None
+        return tile_atlas.get_surface(self.tile_index)
     def draw(self, screen, camera=None):
         if camera:
             rect = camera.apply(self.rect)
@@ -389,15 +500,18 @@ class Wall:
         else:
             pygame.draw.rect(screen, self.color, rect)
 
+# Collision-only rectangle covering a block of merged wall tiles
+class Collider:
+    def __init__(self, rect):
+        self.rect = rect
+        self.is_ethereal = False
+        self.is_metal = False
+
 # Platform class
 class Platform(Wall):
+    image_name = "platform.png"
     def __init__(self, x, y, width, height=10):
         super().__init__(x, y, width, height, (0, 255, 0))
-        try:
-            self.image = load_image("platform.png")
-            self.image = pygame.transform.scale(self.image, (width, height))
-        except:
-            self.image = None
 
 # Dimension Portal class
 class DimensionPortal:
@@ -419,7 +533,9 @@ class DimensionPortal:
             self.image = load_image(f"portal_{target_dimension.name.lower()}.png")
         except:
             self.image = None
-        if not self.image:
+        self.rotation_frames = None  # Shared by every portal of this dimension, built on first draw
+        self.animation = None
+        if not self.image and not is_headless():
             self.frames = []
             for i in range(8):
                 surf = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
@@ -436,21 +552,22 @@ class DimensionPortal:
         else:
             rect = self.rect
         if self.image:
-            angle = self.animation_timer
-            rotated_image = pygame.transform.rotate(self.image, angle)
-            new_rect = rotated_image.get_rect(center=rect.center)
-            screen.blit(rotated_image, new_rect)
+            if self.rotation_frames is None:
+                self.rotation_frames = get_rotation_frames(("portal", self.target_dimension), self.image)
+            steps = len(self.rotation_frames)
+            rotated_image, (offset_x, offset_y) = self.rotation_frames[round(self.animation_timer * steps / 360) % steps]
+            screen.blit(rotated_image, (rect.centerx + offset_x, rect.centery + offset_y))
         else:
             current_frame = self.animation.update()
             screen.blit(current_frame, rect)
 
 # Collectible class
 class Collectible:
-    def __init__(self, x, y, value=10):
+    def __init__(self, x, y, value=10, rng=None):
         self.rect = pygame.Rect(x + TILE_SIZE//4, y + TILE_SIZE//4, TILE_SIZE//2, TILE_SIZE//2)
         self.color = (255, 215, 0)
         self.value = value
-        self.animation_timer = random.randint(0, 360)
+        self.animation_timer = (rng or random).randint(0, 360)
         try:
             self.image = load_image("collectible.png")
         except:
@@ -458,12 +575,8 @@ class Collectible:
     def update(self):
         self.animation_timer = (self.animation_timer + 1) % 360
     def draw(self, screen, camera=None):
-        offset_y = math.sin(self.animation_timer / 30) * 3
-        if camera:
-            rect = camera.apply(self.rect)
-            rect.y += offset_y
-        else:
-            rect = pygame.Rect(self.rect.x, self.rect.y + offset_y, self.rect.width, self.rect.height)
+        rect = camera.apply(self.rect) if camera else self.rect.copy()
+        rect.y += BOB_OFFSETS[self.animation_timer]
         if self.image:
             screen.blit(self.image, rect)
         else:
@@ -473,16 +586,21 @@ class Collectible:
 
 # Hazard class
 class Hazard:
+    image_name = "hazard.png"
     def __init__(self, x, y, width, height, damage=10):
         self.rect = pygame.Rect(x, y, width, height)
         self.color = (255, 50, 50)
         self.damage = damage
         self.animation_timer = 0
         try:
-            self.image = load_image("hazard.png")
-            self.image = pygame.transform.scale(self.image, (width, height))
+            self.tile_index = tile_atlas.get_index(self.image_name, width, height)
         except:
-            self.image = None
+            self.tile_index = None
+    @property
+    def image(self):
+        if self.tile_index is None:
+            return None
+        return tile_atlas.get_surface(self.tile_index)
     def update(self):
         self.animation_timer = (self.animation_timer + 1) % 60
     def draw(self, screen, camera=None):
@@ -501,10 +619,10 @@ class Hazard:
 
 # Powerup class
 class Powerup:
-    def __init__(self, x, y, powerup_type="health"):
+    def __init__(self, x, y, powerup_type="health", rng=None):
         self.rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
         self.powerup_type = powerup_type
-        self.animation_timer = random.randint(0, 360)
+        self.animation_timer = (rng or random).randint(0, 360)
         if powerup_type == "health":
             self.color = (0, 255, 0)
         elif powerup_type == "speed":
@@ -517,24 +635,23 @@ class Powerup:
             self.image = load_image(f"powerup_{powerup_type}.png")
         except:
             self.image = None
+        self.pulse_frames = None
     def update(self):
         self.animation_timer = (self.animation_timer + 1) % 360
     def draw(self, screen, camera=None):
-        offset_y = math.sin(self.animation_timer / 30) * 3
-        scale = 1.0 + math.sin(self.animation_timer / 15) * 0.1
-        if camera:
-            base_rect = camera.apply(self.rect)
-        else:
-            base_rect = self.rect.copy()
-        rect = pygame.Rect(base_rect.x, base_rect.y + offset_y, base_rect.width, base_rect.height)
+        rect = camera.apply(self.rect) if camera else self.rect
+        center_x, center_y = rect.center
         if self.image:
-            scaled_size = (int(self.image.get_width() * scale), int(self.image.get_height() * scale))
-            scaled_image = pygame.transform.scale(self.image, scaled_size)
-            scaled_rect = scaled_image.get_rect(center=rect.center)
-            screen.blit(scaled_image, scaled_rect)
+            if self.pulse_frames is None:
+                # Shared by every powerup of this type
+                self.pulse_frames = get_pulse_frames(("powerup", self.powerup_type), self.image)
+            frame, (offset_x, offset_y) = self.pulse_frames[self.animation_timer]
+            screen.blit(frame, (center_x + offset_x, center_y + offset_y))
         else:
-            pygame.draw.circle(screen, self.color, rect.center, int(rect.width // 2 * scale))
-            pygame.draw.circle(screen, (255, 255, 255), rect.center, int(rect.width // 4 * scale))
+            center = (center_x, center_y + BOB_OFFSETS[self.animation_timer])
+            scale = PULSE_SCALES[self.animation_timer]
+            pygame.draw.circle(screen, self.color, center, int(rect.width // 2 * scale))
+            pygame.draw.circle(screen, (255, 255, 255), center, int(rect.width // 4 * scale))
     def apply_effect(self, player):
         if self.powerup_type == "health":
             player.heal(25)
@@ -555,20 +672,29 @@ class MovingPlatform(Platform):
         self.y_range = y_range
         self.speed = speed
         self.progress = 0
+        self.prev_rect = self.rect.copy()  # Where the platform was before the last update
     def update(self):
+        self.prev_rect.topleft = self.rect.topleft
         self.progress = (self.progress + self.speed) % 360
         if self.x_range > 0:
             self.rect.x = self.start_x + math.sin(math.radians(self.progress)) * self.x_range
         if self.y_range > 0:
             self.rect.y = self.start_y + math.sin(math.radians(self.progress)) * self.y_range
+    def draw(self, screen, camera=None, alpha=1.0):
+        # Between the last two positions, like the player riding it
+        x = self.prev_rect.x + (self.rect.x - self.prev_rect.x) * alpha
+        y = self.prev_rect.y + (self.rect.y - self.prev_rect.y) * alpha
+        rect = pygame.Rect(x, y, self.rect.width, self.rect.height)
+        if camera:
+            rect = camera.apply(rect)
+        if self.image:
+            screen.blit(self.image, rect)
+        else:
+            pygame.draw.rect(screen, self.color, rect)
 
 # Metal Wall class for magnetic dimension
 class MetalWall(Wall):
+    image_name = "metal_wall.png"
     def __init__(self, x, y, width, height):
         super().__init__(x, y, width, height, (192, 192, 192))
         self.is_metal = True
-        try:
-            self.image = load_image("metal_wall.png")
-            self.image = pygame.transform.scale(self.image, (width, height))
-        except:
-            self.image = None
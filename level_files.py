@@ -0,0 +1,121 @@
+import os
+import struct
+import hashlib
+from array import array
+from game_engine import TILE_SIZE
+
+# Level packs are folders of plain-text layouts, one file per level, loaded in name order
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+LEVEL_EXTENSION = ".txt"
+COMPILED_EXTENSION = ".lvlc"
+
+# Every character a layout may use; S marks the start and E the exit.
+# Lines starting with ';' are comments.
+LEGEND = " #PMNIETGXWDCHSJV"
+
+# Parsed layout of one level file
+class LevelFile:
+    def __init__(self, path, layout, start_pos, end_pos, has_start=True, has_end=True):
+        self.path = path
+        self.layout = layout        # Rows with S and E already replaced by empty space
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.has_start = has_start  # Without an S or E marker the position defaults to (0, 0)
+        self.has_end = has_end
+
+def parse_level_text(text, path="<string>"):
+    rows = []
+    start_pos = None
+    end_pos = None
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if line.startswith(';'):
+            continue
+        y = len(rows)
+        for x, cell in enumerate(line):
+            if cell not in LEGEND:
+                raise ValueError(f"{path}:{line_number}: unknown tile {cell!r}")
+            if cell == 'S':
+                start_pos = (x * TILE_SIZE, y * TILE_SIZE)
+            elif cell == 'E':
+                end_pos = (x * TILE_SIZE, y * TILE_SIZE)
+        rows.append(line.replace('S', ' ').replace('E', ' '))
+    if not rows:
+        raise ValueError(f"{path}: level has no rows")
+    return LevelFile(path, rows, start_pos or (0, 0), end_pos or (0, 0),
+                     start_pos is not None, end_pos is not None)
+
+# Compiled sidecar: header, row lengths, then the rows back to back.
+# The digest of the source text decides whether the sidecar is still valid.
+class CompiledLevel:
+    MAGIC = b"DSPL"
+    VERSION = 2
+    # magic, version, source digest, start x, start y, end x, end y, has start, has end, row count
+    HEADER = struct.Struct("<4sH16siiii??I")
+
+    @staticmethod
+    def digest(data):
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    @classmethod
+    def save(cls, path, level_file, digest):
+        lengths = array('I', [len(row) for row in level_file.layout])
+        header = cls.HEADER.pack(cls.MAGIC, cls.VERSION, digest,
+                                 *level_file.start_pos, *level_file.end_pos,
+                                 level_file.has_start, level_file.has_end, len(lengths))
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(lengths.tobytes())
+            f.write("".join(level_file.layout).encode('latin-1'))
+
+    @classmethod
+    def load(cls, path, source_path, digest):
+        # Returns None when the sidecar is missing, foreign or stale
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < cls.HEADER.size:
+            return None
+        (magic, version, file_digest, start_x, start_y, end_x, end_y,
+         has_start, has_end, row_count) = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION or file_digest != digest:
+            return None
+        offset = cls.HEADER.size
+        lengths = array('I')
+        lengths.frombytes(data[offset:offset + row_count * lengths.itemsize])
+        offset += row_count * lengths.itemsize
+        text = data[offset:].decode('latin-1')
+        if len(lengths) != row_count or len(text) != sum(lengths):
+            return None
+        rows = []
+        position = 0
+        for length in lengths:
+            rows.append(text[position:position + length])
+            position += length
+        return LevelFile(source_path, rows, (start_x, start_y), (end_x, end_y), has_start, has_end)
+
+def compiled_path(path):
+    return os.path.splitext(path)[0] + COMPILED_EXTENSION
+
+def load_level_file(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = CompiledLevel.digest(data)
+    sidecar = compiled_path(path)
+    level_file = CompiledLevel.load(sidecar, path, digest)
+    if level_file is None:
+        level_file = parse_level_text(data.decode('utf-8'), path)
+        try:
+            CompiledLevel.save(sidecar, level_file, digest)
+        except OSError as e:
+            print(f"Could not write compiled level {sidecar}: {e}")
+    return level_file
+
+def list_level_files(directory=LEVEL_DIR):
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(LEVEL_EXTENSION))
+    except OSError as e:
+        print(f"Could not read level folder {directory}: {e}")
+        return []
+    return [os.path.join(directory, name) for name in names]
@@ -1,13 +1,83 @@
 import pygame
 import os
-from game_engine import TILE_SIZE, Dimension, load_image
+import random
+from game_engine import TILE_SIZE, Dimension, tile_atlas, SpatialHash
+from tile_grid import TileGrid, ETHEREAL_WALL, METAL_WALL
+from level_files import LEVEL_DIR, list_level_files, load_level_file
 from game_objects import (
     Wall, Platform, DimensionPortal, Collectible, 
-    Hazard, Powerup, MovingPlatform, MetalWall
+    Hazard, Powerup, MovingPlatform, MetalWall, Collider
 )
 
+# Levels bigger than this (in pixels) draw static tiles one by one instead of baking them
+STATIC_LAYER_MAX_PIXELS = 4096 * 4096
+# Layouts with more tiles than this keep static geometry in a TileGrid instead of objects
+COMPACT_LAYOUT_MIN_TILES = 256 * 256
+
+# Level object lists kept in the spatial index, in draw order
+STATIC_KINDS = ("walls", "platforms")
+DYNAMIC_KINDS = ("moving_platforms", "dimension_portals", "collectibles", "hazards", "powerups")
+
+def run_rect(run, span):
+    (first, last), (top, bottom) = run, span
+    return pygame.Rect(first * TILE_SIZE, top * TILE_SIZE,
+                       (last - first + 1) * TILE_SIZE, (bottom - top + 1) * TILE_SIZE)
+
+def merge_tile_rects(cells):
+    # Merge (column, row) tiles into rectangles: runs along each row, then identical runs down rows
+    rows = {}
+    for x, y in cells:
+        rows.setdefault(y, []).append(x)
+    open_runs = {}  # (first column, last column) -> [top row, bottom row]
+    rects = []
+    for y in sorted(rows):
+        columns = sorted(rows[y])
+        runs = []
+        start = previous = columns[0]
+        for x in columns[1:]:
+            if x != previous + 1:
+                runs.append((start, previous))
+                start = x
+            previous = x
+        runs.append((start, previous))
+        next_runs = {}
+        for run in runs:
+            span = open_runs.pop(run, None)
+            if span is not None and span[1] == y - 1:
+                span[1] = y
+            else:
+                if span is not None:
+                    # Same run, but rows without it in between: close the block above the gap
+                    rects.append(run_rect(run, span))
+                span = [y, y]
+            next_runs[run] = span
+        for run, span in open_runs.items():
+            rects.append(run_rect(run, span))
+        open_runs = next_runs
+    for run, span in open_runs.items():
+        rects.append(run_rect(run, span))
+    return rects
+
+def tile_rects_cover(cells, rects):
+    # True when rects cover exactly these tiles, each once
+    covered = []
+    for rect in rects:
+        for y in range(rect.top // TILE_SIZE, rect.bottom // TILE_SIZE):
+            for x in range(rect.left // TILE_SIZE, rect.right // TILE_SIZE):
+                covered.append((x, y))
+    return len(covered) == len(set(covered)) and set(covered) == set(cells)
+
+def find_end_portal_image(level_index):
+    # Level-specific end portal image if it exists, else the shared one
+    img_folder = "assets/images"
+    for name in (f"end_portal_{level_index+1}.png", f"end_portal_{level_index+1}.jpg",
+                 "end_portal.png", "end_portal.jpg"):
+        if os.path.exists(os.path.join(img_folder, name)):
+            return name
+    return None
+
 class Level:
-    def __init__(self, layout, start_pos, end_pos, level_index=1, background_path=None, music_path=None):
+    def __init__(self, layout, start_pos, end_pos, level_index=1, background_path=None, music_path=None, seed=None, compact=None, merge_walls=True):
         self.walls = []
         self.platforms = []
         self.moving_platforms = []
@@ -20,103 +90,223 @@ class Level:
         self.start_pos = start_pos
         self.end_pos = end_pos
         self.end_rect = pygame.Rect(end_pos[0], end_pos[1], TILE_SIZE, TILE_SIZE)
-        self.width = len(layout[0]) * TILE_SIZE
+        self.width = max(len(row) for row in layout) * TILE_SIZE
         self.height = len(layout) * TILE_SIZE
         self.background_path = background_path
         self.music_path = music_path
+        # Every random value in the level comes from this RNG so runs can be replayed
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
 
         # Auto-load level-specific end portal image if it exists, else fallback
-        img_folder = "assets/images"
-        portal_png = f"end_portal_{level_index+1}.png"
-        portal_jpg = f"end_portal_{level_index+1}.jpg"
-        default_png = "end_portal.png"
-        default_jpg = "end_portal.jpg"
-        portal_path_png = os.path.join(img_folder, portal_png)
-        portal_path_jpg = os.path.join(img_folder, portal_jpg)
-        default_path_png = os.path.join(img_folder, default_png)
-        default_path_jpg = os.path.join(img_folder, default_jpg)
-
-        portal_img_name = None
-        if os.path.exists(portal_path_png):
-            portal_img_name = portal_png
-        elif os.path.exists(portal_path_jpg):
-            portal_img_name = portal_jpg
-        elif os.path.exists(default_path_png):
-            portal_img_name = default_png
-        elif os.path.exists(default_path_jpg):
-            portal_img_name = default_jpg
-
+        portal_img_name = find_end_portal_image(level_index)
         if portal_img_name:
             try:
-                self.end_portal_image = load_image(portal_img_name)
-                self.end_portal_image = pygame.transform.scale(self.end_portal_image, (TILE_SIZE, TILE_SIZE))
+                portal_index = tile_atlas.get_index(portal_img_name, TILE_SIZE, TILE_SIZE)
+                if portal_index is not None:
+                    self.end_portal_image = tile_atlas.get_surface(portal_index)
+                else:
+                    self.end_portal_image = None
             except Exception:
                 self.end_portal_image = None
         else:
             self.end_portal_image = None
 
+        # Walls, static platforms and the exit never move, so they are baked into one surface
+        self.static_layer = None
+        self.use_static_layer = self.width * self.height <= STATIC_LAYER_MAX_PIXELS
+        self.spatial_index = SpatialHash(TILE_SIZE)
+        self.draw_stats = {'drawn': 0, 'culled': 0}
+
+        # Plain walls can collide as merged blocks; ethereal and metal walls stay per tile
+        self.merge_walls = merge_walls
+        self.wall_colliders = None
+        
         # Parse level layout
-        self.parse_layout(layout)
+        if compact is None:
+            compact = len(layout) * max(len(row) for row in layout) > COMPACT_LAYOUT_MIN_TILES
+        self.tile_grid = None
+        if compact:
+            self.parse_tile_grid(layout)
+        else:
+            self.parse_layout(layout)
+        
+        # Everything a play-through can change, so a retry doesn't rebuild the level
+        self.initial_state = self.snapshot()
     
     def parse_layout(self, layout):
         for y, row in enumerate(layout):
             for x, cell in enumerate(row):
-                pos_x = x * TILE_SIZE
-                pos_y = y * TILE_SIZE
-                
-                if cell == '#':  # Wall
-                    self.walls.append(Wall(pos_x, pos_y, TILE_SIZE, TILE_SIZE))
-                elif cell == 'P':  # Platform
-                    self.platforms.append(Platform(pos_x, pos_y, TILE_SIZE))
-                elif cell == 'M':  # Moving platform
-                    self.moving_platforms.append(MovingPlatform(pos_x, pos_y, TILE_SIZE * 3, 10, 0, 100, 1))
-                elif cell == 'H':  # Health powerup
-                    self.powerups.append(Powerup(pos_x, pos_y, "health"))
-                elif cell == 'N':  # Normal dimension portal
-                    self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.NORMAL))
-                elif cell == 'I':  # Inverse dimension portal
-                    self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.INVERSE))
-                elif cell == 'E':  # Ethereal dimension portal
-                    self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.ETHEREAL))
-                elif cell == 'T':  # Time dimension portal
-                    self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.TIME))
-                elif cell == 'G':  # Magnetic dimension portal
-                    self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.MAGNETIC))
-                elif cell == 'C':  # Collectible
-                    self.collectibles.append(Collectible(pos_x, pos_y))
-                elif cell == 'X':  # Ethereal wall
-                    wall = Wall(pos_x, pos_y, TILE_SIZE, TILE_SIZE, (200, 200, 200))
-                    wall.is_ethereal = True
-                    self.walls.append(wall)
-                    self.ethereal_walls.append(wall)
-                elif cell == 'D':  # Hazard/Danger
-                    self.hazards.append(Hazard(pos_x, pos_y, TILE_SIZE, TILE_SIZE))
-                elif cell == 'W':  # Metal wall for magnetic dimension
-                    wall = MetalWall(pos_x, pos_y, TILE_SIZE, TILE_SIZE)
-                    self.walls.append(wall)
-                    self.metal_walls.append(wall)
-                elif cell == 'S':  # Speed powerup
-                    self.powerups.append(Powerup(pos_x, pos_y, "speed"))
-                elif cell == 'J':  # Jump powerup
-                    self.powerups.append(Powerup(pos_x, pos_y, "jump"))
-                elif cell == 'V':  # Invincibility powerup
-                    self.powerups.append(Powerup(pos_x, pos_y, "invincibility"))
-                # Add more cell types as needed
+                self.add_cell(cell, x * TILE_SIZE, y * TILE_SIZE)
+        if self.merge_walls:
+            self.merge_wall_colliders()
+        self.invalidate_static_layer()
+        self.build_spatial_index()
+    
+    def merge_wall_colliders(self):
+        cells = [(wall.rect.x // TILE_SIZE, wall.rect.y // TILE_SIZE)
+                 for wall in self.walls if not wall.is_ethereal and not wall.is_metal]
+        colliders = [Collider(rect) for rect in merge_tile_rects(cells)] if cells else []
+        self.wall_colliders = colliders + [wall for wall in self.walls if wall.is_ethereal or wall.is_metal]
+    
+    def parse_tile_grid(self, layout):
+        # Walls and platforms stay in the grid; only entities with their own state become objects
+        self.tile_grid = TileGrid(layout)
+        for cell, pos_x, pos_y in self.tile_grid.entity_cells():
+            self.add_cell(cell, pos_x, pos_y)
+        self.metal_walls = self.tile_grid.tiles(METAL_WALL)
+        self.ethereal_walls = self.tile_grid.tiles(ETHEREAL_WALL)
+        self.invalidate_static_layer()
+        self.build_spatial_index()
+    
+    def add_cell(self, cell, pos_x, pos_y):
+        if cell == '#':  # Wall
+            self.walls.append(Wall(pos_x, pos_y, TILE_SIZE, TILE_SIZE))
+        elif cell == 'P':  # Platform
+            self.platforms.append(Platform(pos_x, pos_y, TILE_SIZE))
+        elif cell == 'M':  # Moving platform
+            self.moving_platforms.append(MovingPlatform(pos_x, pos_y, TILE_SIZE * 3, 10, 0, 100, 1))
+        elif cell == 'H':  # Health powerup
+            self.powerups.append(Powerup(pos_x, pos_y, "health", self.rng))
+        elif cell == 'N':  # Normal dimension portal
+            self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.NORMAL))
+        elif cell == 'I':  # Inverse dimension portal
+            self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.INVERSE))
+        elif cell == 'E':  # Ethereal dimension portal
+            self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.ETHEREAL))
+        elif cell == 'T':  # Time dimension portal
+            self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.TIME))
+        elif cell == 'G':  # Magnetic dimension portal
+            self.dimension_portals.append(DimensionPortal(pos_x, pos_y, Dimension.MAGNETIC))
+        elif cell == 'C':  # Collectible
+            self.collectibles.append(Collectible(pos_x, pos_y, rng=self.rng))
+        elif cell == 'X':  # Ethereal wall
+            wall = Wall(pos_x, pos_y, TILE_SIZE, TILE_SIZE, (200, 200, 200))
+            wall.is_ethereal = True
+            self.walls.append(wall)
+            self.ethereal_walls.append(wall)
+        elif cell == 'D':  # Hazard/Danger
+            self.hazards.append(Hazard(pos_x, pos_y, TILE_SIZE, TILE_SIZE))
+        elif cell == 'W':  # Metal wall for magnetic dimension
+            wall = MetalWall(pos_x, pos_y, TILE_SIZE, TILE_SIZE)
+            self.walls.append(wall)
+            self.metal_walls.append(wall)
+        elif cell == 'S':  # Speed powerup
+            self.powerups.append(Powerup(pos_x, pos_y, "speed", self.rng))
+        elif cell == 'J':  # Jump powerup
+            self.powerups.append(Powerup(pos_x, pos_y, "jump", self.rng))
+        elif cell == 'V':  # Invincibility powerup
+            self.powerups.append(Powerup(pos_x, pos_y, "invincibility", self.rng))
+        # Add more cell types as needed
     
-    def update(self):
+    def invalidate_static_layer(self):
+        self.static_layer = None
+    
+    def build_spatial_index(self):
+        if self.tile_grid is not None:
+            # The grid answers static queries itself and keeps dynamic objects in its own hash
+            self.tile_grid.dynamic = SpatialHash(TILE_SIZE)
+            self.spatial_index = self.tile_grid
+            kinds = DYNAMIC_KINDS
+        else:
+            self.spatial_index = SpatialHash(TILE_SIZE)
+            kinds = STATIC_KINDS + DYNAMIC_KINDS
+        for kind in kinds:
+            objects = getattr(self, kind)
+            if kind == "walls" and self.wall_colliders is not None:
+                # Collision queries get the merged blocks; tiles are only indexed for drawing
+                for collider in self.wall_colliders:
+                    self.spatial_index.insert(collider, "walls")
+                kind = "wall_tiles"
+            for obj in objects:
+                self.spatial_index.insert(obj, kind)
+    
+    def draw_kind(self, kind):
+        if kind == "walls" and self.wall_colliders is not None:
+            return "wall_tiles"
+        return kind
+    
+    def sync_spatial_index(self):
+        # Collectibles and powerups are removed from their lists when picked up
+        for kind in ("collectibles", "powerups"):
+            objects = getattr(self, kind)
+            if len(objects) != self.spatial_index.count(kind):
+                remaining = set(objects)
+                for obj in self.spatial_index.objects(kind):
+                    if obj not in remaining:
+                        self.spatial_index.remove(obj)
+    
+    def snapshot(self, cosmetic=True):
+        # Only mutable state; geometry, images and the static layer are shared.
+        # Without cosmetic state (timers, RNG) the snapshot only covers what physics reads.
+        state = {
+            'collectibles': list(self.collectibles),
+            'powerups': list(self.powerups),
+            'moving_platforms': [(platform, platform.progress, platform.rect.topleft, platform.prev_rect.topleft)
+                                 for platform in self.moving_platforms],
+        }
+        if cosmetic:
+            animated = self.collectibles + self.powerups + self.hazards + self.dimension_portals
+            state['timers'] = [(obj, obj.animation_timer) for obj in animated]
+            state['rng'] = self.rng.getstate()
+        return state
+    
+    def restore(self, state):
+        # Lists are refilled in place since the player and simulation hold references to them
+        self.collectibles[:] = state['collectibles']
+        self.powerups[:] = state['powerups']
+        for platform, progress, topleft, prev_topleft in state['moving_platforms']:
+            platform.progress = progress
+            platform.rect.topleft = topleft
+            platform.prev_rect.topleft = prev_topleft
+        if 'timers' in state:
+            for obj, timer in state['timers']:
+                obj.animation_timer = timer
+            self.rng.setstate(state['rng'])
+        
+        # Put picked-up items back in the index and re-bucket platforms that moved
+        for kind in ("collectibles", "powerups"):
+            for obj in getattr(self, kind):
+                if obj not in self.spatial_index:
+                    self.spatial_index.insert(obj, kind)
+        for platform in self.moving_platforms:
+            self.spatial_index.move(platform)
+    
+    def reset(self):
+        self.restore(self.initial_state)
+    
+    def build_static_layer(self):
+        layer = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        if pygame.display.get_surface():
+            layer = layer.convert_alpha()
+        self.draw_end_portal(layer)
+        if self.tile_grid is not None:
+            self.tile_grid.draw(layer, layer.get_rect())
+        for wall in self.walls:
+            wall.draw(layer)
+        for platform in self.platforms:
+            platform.draw(layer)
+        self.static_layer = layer
+    
+    def update(self, active_rect=None):
+        self.sync_spatial_index()
         for platform in self.moving_platforms:
             platform.update()
-        for collectible in self.collectibles:
-            collectible.update()
-        for hazard in self.hazards:
-            hazard.update()
-        for powerup in self.powerups:
-            powerup.update()
-        for portal in self.dimension_portals:
-            portal.update()
+            self.spatial_index.move(platform)
+        # The rest only animates. When a kind has more objects than the active area has grid
+        # cells, only the ones inside it update; the others stay paused off camera.
+        if active_rect is not None:
+            active_cells = (active_rect.width // TILE_SIZE + 1) * (active_rect.height // TILE_SIZE + 1)
+        for kind in ("collectibles", "hazards", "powerups", "dimension_portals"):
+            objects = getattr(self, kind)
+            if active_rect is not None and len(objects) > active_cells:
+                objects = self.spatial_index.query(active_rect, kind)
+            for obj in objects:
+                obj.update()
     
-    def draw(self, screen, camera=None):
-        # Draw end point (exit portal)
+    def draw_end_portal(self, screen, camera=None):
         if camera:
             end_rect = camera.apply(self.end_rect)
         else:
@@ -125,260 +315,109 @@ class Level:
             screen.blit(self.end_portal_image, end_rect)
         else:
             pygame.draw.rect(screen, (0, 255, 0), end_rect)
-        
-        # Draw level elements
-        for wall in self.walls:
-            wall.draw(screen, camera)
-        for platform in self.platforms:
-            platform.draw(screen, camera)
-        for platform in self.moving_platforms:
-            platform.draw(screen, camera)
-        for portal in self.dimension_portals:
-            portal.draw(screen, camera)
-        for collectible in self.collectibles:
-            collectible.draw(screen, camera)
-        for hazard in self.hazards:
-            hazard.draw(screen, camera)
-        for powerup in self.powerups:
-            powerup.draw(screen, camera)
-
-class LevelManager:
-    def __init__(self):
-        self.levels = self.create_levels()
-        self.current_level = 0
     
-    def create_levels(self):
-        levels = []
-        
-        # Level 1: Introduction to basic movement and normal dimension
-        level1_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S  D            #",
-            "#  ####            #",
-            "#                  #",
-            "#         C  D      #",
-            "#         ###      #",
-            "#                  #",
-            "#                  #",
-            "#                  #",
-            "#              D E #",
-            "#             #### #",
-            "#     D            #",
-            "########PPP#########",
-        ]
-        
-        # Level 2: Introduction to inverse gravity
-        level2_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ###             #",
-            "#         I        #",
-            "#        ###       #",
-            "#                  #",
-            "#                  #",
-            "#                  #",
-            "#              N   #",
-            "#             #### #",
-            "#                  #",
-            "#         E        #",
-            "####################",
-        ]
-        
-        # Level 3: Introduction to ethereal dimension
-        level3_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ###             #",
-            "#                  #",
-            "#         E        #",
-            "#        ###       #",
-            "#                  #",
-            "#        X         #",
-            "#        X    N    #",
-            "#        X   ##### #",
-            "#        X         #",
-            "#        X         #",
-            "####################",
-        ]
-        
-        # Level 4: Introduction to time dimension
-        level4_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ###             #",
-            "#                  #",
-            "#         T        #",
-            "#        ###       #",
-            "#                  #",
-            "#                  #",
-            "#              N   #",
-            "#             #### #",
-            "#                  #",
-            "#                  #",
-            "####################",
-        ]
-        
-        # Level 5: Introduction to magnetic dimension
-        level5_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ###             #",
-            "#                  #",
-            "#         G        #",
-            "#        ###       #",
-            "#                  #",
-            "#                  #",
-            "#        W    N    #",
-            "#        W   ##### #",
-            "#                  #",
-            "#                  #",
-            "####################",
-        ]
-        
-        # Level 6: Combining dimensions with hazards
-        level6_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ###             #",
-            "#                  #",
-            "#         E        #",
-            "#        ###       #",
-            "#                  #",
-            "#        X         #",
-            "#        X    I    #",
-            "#        X   ##### #",
-            "#        XDDDDDDDDD#",
-            "#                  #",
-            "####################",
-        ]
-        
-        # Level 7: Moving platforms and collectibles
-        level7_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ####            #",
-            "#         C        #",
-            "#                  #",
-            "#        M         #",
-            "#                  #",
-            "#                C #",
-            "#              N   #",
-            "#             #### #",
-            "#                  #",
-            "#         H        #",
-            "####################",
-        ]
-        
-        # Level 8: Complex ethereal maze
-        level8_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ##              #",
-            "#         E        #",
-            "#        ###       #",
-            "#        X#X       #",
-            "#        X#X       #",
-            "#        X#X       #",
-            "#        X#X  N    #",
-            "#        X#X ##### #",
-            "#        X         #",
-            "#        X         #",
-            "####################",
-        ]
-        
-        # Level 9: Time-based precision jumping
-        level9_layout = [
-            "####################",
-            "#                  #",
-            "#                  #",
-            "#  S               #",
-            "#  ###             #",
-            "#                  #",
-            "#         T        #",
-            "#        ###       #",
-            "#                  #",
-            "#   P   P   P      #",
-            "#                  #",
-            "#                  #",
-            "#DDDDDDDDDDDDDDDDD #",
-            "#                  #",
-            "####################",
-        ]
+    def draw(self, screen, camera=None, alpha=1.0):
+        # alpha places moving platforms between their last two positions
+        if camera:
+            view = pygame.Rect(camera.rect.x, camera.rect.y, screen.get_width(), screen.get_height())
+        else:
+            view = screen.get_rect()
+        self.sync_spatial_index()
+        drawn = 0
         
-        # Level 10: Master level combining all dimensions
-        level10_layout = [
-            "####################",
-            "#        C         #",
-            "#        #         #",
-            "#  S     #         #",
-            "#  ###   #         #",
-            "#        #    I    #",
-            "#        #   ##### #",
-            "#        #         #",
-            "#        #         #",
-            "#        X    W    #",
-            "#        X    E    #",
-            "#        X   ##### #",
-            "#        X         #",
-            "#        X    T    #",
-            "####################",
-        ]
+        # Draw exit portal, walls and static platforms
+        if self.use_static_layer:
+            if self.static_layer is None:
+                self.build_static_layer()
+            screen.blit(self.static_layer, (0, 0), view)
+        else:
+            if view.colliderect(self.end_rect):
+                self.draw_end_portal(screen, camera)
+                drawn += 1
+            if self.tile_grid is not None:
+                drawn += self.tile_grid.draw(screen, view)
+            else:
+                for kind in STATIC_KINDS:
+                    for obj in self.spatial_index.query(view, self.draw_kind(kind)):
+                        obj.draw(screen, camera)
+                        drawn += 1
         
-        # Convert layouts to actual levels
-        layouts = [level1_layout, level2_layout, level3_layout, level4_layout, level5_layout,
-                  level6_layout, level7_layout, level8_layout, level9_layout, level10_layout]
+        # Draw level elements that are on screen; the margin covers bobbing and rotated sprites
+        query_view = view.inflate(TILE_SIZE, TILE_SIZE)
+        for kind in DYNAMIC_KINDS:
+            for obj in self.spatial_index.query(query_view, kind):
+                if kind == "moving_platforms":
+                    obj.draw(screen, camera, alpha)
+                else:
+                    obj.draw(screen, camera)
+                drawn += 1
         
-        for i, layout in enumerate(layouts):
-            # Find start and end positions
-            start_pos = (0, 0)
-            end_pos = (0, 0)
-            for y, row in enumerate(layout):
-                for x, cell in enumerate(row):
-                    if cell == 'S':
-                        start_pos = (x * TILE_SIZE, y * TILE_SIZE)
-                    if cell == 'E':
-                        end_pos = (x * TILE_SIZE, y * TILE_SIZE)
+        total = sum(self.spatial_index.count(kind) for kind in DYNAMIC_KINDS)
+        if not self.use_static_layer:
+            total += 1 + sum(self.spatial_index.count(self.draw_kind(kind)) for kind in STATIC_KINDS)
+        self.draw_stats['drawn'] = drawn
+        self.draw_stats['culled'] = total - drawn
 
-            # Replace 'S' and 'E' with empty space in the layout
-            layout = [row.replace('S', ' ').replace('E', ' ') for row in layout]
-            
-            # --- Background selection logic ---
-            bg_folder = "assets/images"
-            bg_png = f"background_{i+1}.png"
-            bg_jpg = f"background_{i+1}.jpg"
-            bg_path_png = os.path.join(bg_folder, bg_png)
-            bg_path_jpg = os.path.join(bg_folder, bg_jpg)
-            if os.path.exists(bg_path_png):
-                background_path = bg_path_png
-            elif os.path.exists(bg_path_jpg):
-                background_path = bg_path_jpg
-            else:
-                background_path = None
+# Parsed layout and metadata for a level; the Level itself is only built when first visited
+class LevelDescriptor:
+    def __init__(self, index, layout, start_pos, end_pos, background_path=None, music_path=None):
+        self.index = index
+        self.layout = layout
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.background_path = background_path
+        self.music_path = music_path
+        self.collectible_count = sum(row.count('C') for row in layout)
+
+class LevelManager:
+    def __init__(self, level_dir=LEVEL_DIR):
+        self.level_dir = level_dir
+        self.level_descriptors = self.create_descriptors()
+        self.levels = [None] * len(self.level_descriptors)  # Built lazily by get_level
+        self.current_level = 0
+    
+    def create_descriptors(self):
+        descriptors = []
+        for path in list_level_files(self.level_dir):
+            try:
+                level_file = load_level_file(path)
+            except (OSError, ValueError) as e:
+                print(f"Skipping level {path}: {e}")
+                continue
+            descriptors.append(self.describe_level(len(descriptors), level_file))
+        return descriptors
+    
+    def describe_level(self, i, level_file):
+        # --- Background selection logic ---
+        bg_folder = "assets/images"
+        bg_png = f"background_{i+1}.png"
+        bg_jpg = f"background_{i+1}.jpg"
+        bg_path_png = os.path.join(bg_folder, bg_png)
+        bg_path_jpg = os.path.join(bg_folder, bg_jpg)
+        if os.path.exists(bg_path_png):
+            background_path = bg_path_png
+        elif os.path.exists(bg_path_jpg):
+            background_path = bg_path_jpg
+        else:
+            background_path = None
 
-            music_path = f"assets/sounds/level_{i+1}.mp3"
-            
-            levels.append(Level(layout, start_pos, end_pos, i, background_path, music_path))
+        music_path = f"assets/sounds/level_{i+1}.mp3"
         
-        return levels
+        return LevelDescriptor(i, level_file.layout, level_file.start_pos, level_file.end_pos,
+                               background_path, music_path)
+    
+    def build_level(self, i, seed=None):
+        descriptor = self.level_descriptors[i]
+        return Level(descriptor.layout, descriptor.start_pos, descriptor.end_pos, i,
+                     descriptor.background_path, descriptor.music_path, seed)
+    
+    def get_level(self, i):
+        if self.levels[i] is None:
+            self.levels[i] = self.build_level(i)
+        return self.levels[i]
     
     def get_current_level(self):
-        return self.levels[self.current_level]
+        return self.get_level(self.current_level)
     
     def next_level(self):
         if self.current_level < len(self.levels) - 1:
@@ -387,5 +426,9 @@ class LevelManager:
         return False
     
     def reset_level(self):
-        # Recreate the current level to reset it
-        self.levels[self.current_level] = self.create_levels()[self.current_level]
+        # Restore the current level's starting state; only build it if it was never loaded
+        level = self.levels[self.current_level]
+        if level is None:
+            self.get_current_level()
+        else:
+            level.reset()
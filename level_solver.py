@@ -0,0 +1,230 @@
+import os
+import sys
+import time
+from collections import deque
+
+if __name__ == "__main__":
+    # Run without a window or audio device
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from game_engine import TILE_SIZE, GameState, set_headless
+from game_objects import Player
+from level_files import parse_level_text
+from level_manager import Level
+from simulation import Simulation, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+# Each search step holds one input combination for this many simulation ticks
+HOLD_TICKS = 8
+ACTIONS = (
+    INPUT_RIGHT,
+    INPUT_LEFT,
+    INPUT_RIGHT | INPUT_JUMP,
+    INPUT_LEFT | INPUT_JUMP,
+    INPUT_JUMP,
+    0,
+)
+MAX_NODES = 200000
+
+# States closer than this are treated as the same search node
+POSITION_STEP = TILE_SIZE // 2
+VEL_X_STEP = 3
+VEL_Y_STEP = 10
+HEALTH_STEP = 25
+PHASE_STEP = 60
+
+# Player attributes the physics reads or writes; everything else is cosmetic
+PLAYER_STATE = (
+    "x", "y", "prev_x", "prev_y", "vel_x", "vel_y", "max_vel_x", "can_jump", "dimension",
+    "shift_cooldown", "health", "invincible", "score", "facing_right",
+    "is_jumping", "is_falling", "is_idle",
+)
+
+class SolveResult:
+    def __init__(self):
+        self.solved = False
+        self.inputs = None          # Per-tick INPUT_* bits that finish the level, if solved
+        self.reached_exit = False   # Touched the exit at all, even with collectibles left
+        self.exit_blocked = False   # The exit tile is inside a solid wall
+        self.collected = set()      # Indices of collectibles picked up on some explored path
+        self.total_collectibles = 0
+        self.nodes = 0
+        self.exhausted = False      # Hit the node limit before the search finished
+        self.elapsed = 0.0
+
+class LevelSolver:
+    def __init__(self, level, hold_ticks=HOLD_TICKS, max_nodes=MAX_NODES):
+        self.level = level
+        self.hold_ticks = hold_ticks
+        self.max_nodes = max_nodes
+        level.reset()
+        self.simulation = Simulation(level, Player(*level.start_pos))
+        self.collectible_bits = {obj: 1 << i for i, obj in enumerate(level.collectibles)}
+        self.powerup_bits = {obj: 1 << i for i, obj in enumerate(level.powerups)}
+        # A platform's phase only matters for states near the area it sweeps through;
+        # the player can always wait there for the phase they need
+        self.platform_zones = []
+        for platform in level.moving_platforms:
+            zone = pygame.Rect(platform.start_x - platform.x_range, platform.start_y - platform.y_range,
+                               platform.rect.width + 2 * platform.x_range,
+                               platform.rect.height + 2 * platform.y_range)
+            self.platform_zones.append((platform, zone.inflate(4 * TILE_SIZE, 4 * TILE_SIZE)))
+
+    def capture(self):
+        player = self.simulation.player
+        return (tuple(getattr(player, name) for name in PLAYER_STATE),
+                self.level.snapshot(cosmetic=False), self.simulation.tick)
+
+    def restore(self, state):
+        player_state, level_state, tick = state
+        player = self.simulation.player
+        for name, value in zip(PLAYER_STATE, player_state):
+            setattr(player, name, value)
+        # Particles are cosmetic; dropping them keeps the search from paying for their updates
+        player.particle_system.count = 0
+        self.level.restore(level_state)
+        self.simulation.tick = tick
+        self.simulation.state = GameState.PLAYING
+
+    def remaining_mask(self, objects, bits):
+        mask = 0
+        for obj in objects:
+            mask |= bits[obj]
+        return mask
+
+    def state_key(self):
+        player = self.simulation.player
+        level = self.level
+        player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
+        return (
+            int(player.x) // POSITION_STEP,
+            int(player.y) // POSITION_STEP,
+            round(player.vel_x / VEL_X_STEP),
+            round(player.vel_y / VEL_Y_STEP),
+            player.can_jump,
+            player.dimension,
+            player.shift_cooldown > 0,
+            player.health // HEALTH_STEP,
+            player.invincible > 0,
+            self.remaining_mask(level.collectibles, self.collectible_bits),
+            self.remaining_mask(level.powerups, self.powerup_bits),
+            tuple(platform.progress // PHASE_STEP if player_rect.colliderect(zone) else -1
+                  for platform, zone in self.platform_zones),
+        )
+
+    def exit_blocked(self):
+        end_rect = self.level.end_rect
+        for wall in self.level.spatial_index.query(end_rect, "walls"):
+            if not wall.is_ethereal and wall.rect.contains(end_rect):
+                return True
+        return False
+
+    def run_action(self, action):
+        # Hold one action; returns the final state and how many ticks were used
+        simulation = self.simulation
+        player = simulation.player
+        end_rect = self.level.end_rect
+        for tick in range(self.hold_ticks):
+            state = simulation.step(action)
+            if pygame.Rect(player.x, player.y, player.width, player.height).colliderect(end_rect):
+                self.result.reached_exit = True
+            if state != GameState.PLAYING:
+                return state, tick + 1
+        return GameState.PLAYING, self.hold_ticks
+
+    def path_inputs(self, parents, key, last_action, last_ticks):
+        steps = [(last_action, last_ticks)]
+        while parents[key] is not None:
+            key, action = parents[key]
+            steps.append((action, self.hold_ticks))
+        inputs = bytearray()
+        for action, ticks in reversed(steps):
+            inputs.extend([action] * ticks)
+        return inputs
+
+    def solve(self):
+        # Breadth-first over held actions, so the first solution uses the fewest steps
+        self.result = result = SolveResult()
+        result.total_collectibles = len(self.collectible_bits)
+        start_time = time.perf_counter()
+        result.exit_blocked = self.exit_blocked()
+        if result.exit_blocked and not result.total_collectibles:
+            # Nothing left to find out by searching
+            self.level.reset()
+            result.elapsed = time.perf_counter() - start_time
+            return result
+
+        start = self.capture()
+        start_key = self.state_key()
+        parents = {start_key: None}
+        frontier = deque([(start, start_key)])
+        while frontier:
+            state, key = frontier.popleft()
+            # Jump inputs do nothing while airborne, so only branch on them from the ground
+            can_jump = state[0][PLAYER_STATE.index("can_jump")]
+            for action in ACTIONS:
+                if action & INPUT_JUMP and not can_jump:
+                    continue
+                self.restore(state)
+                outcome, ticks = self.run_action(action)
+                result.nodes += 1
+                remaining = self.remaining_mask(self.level.collectibles, self.collectible_bits)
+                for i in range(result.total_collectibles):
+                    if not remaining & (1 << i):
+                        result.collected.add(i)
+                if outcome == GameState.LEVEL_COMPLETE:
+                    result.solved = True
+                    result.inputs = self.path_inputs(parents, key, action, ticks)
+                    break
+                if outcome != GameState.PLAYING:
+                    continue
+                next_key = self.state_key()
+                if next_key in parents:
+                    continue
+                parents[next_key] = (key, action)
+                frontier.append((self.capture(), next_key))
+            if result.solved or (result.exit_blocked and len(result.collected) == result.total_collectibles):
+                break
+            if result.nodes >= self.max_nodes:
+                result.exhausted = True
+                break
+
+        self.level.reset()
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+def solve_level(level, hold_ticks=HOLD_TICKS, max_nodes=MAX_NODES):
+    return LevelSolver(level, hold_ticks, max_nodes).solve()
+
+def solve_layout(text, hold_ticks=HOLD_TICKS, max_nodes=MAX_NODES):
+    # Raw level file text, legend and all
+    level_file = parse_level_text(text)
+    level = Level(level_file.layout, level_file.start_pos, level_file.end_pos)
+    return solve_level(level, hold_ticks, max_nodes)
+
+def main():
+    set_headless(True)
+    from level_manager import LevelManager
+    level_manager = LevelManager()
+    all_solved = True
+    start = time.perf_counter()
+    for i in range(len(level_manager.levels)):
+        result = solve_level(level_manager.get_level(i))
+        if result.solved:
+            status = f"solved in {len(result.inputs)} ticks"
+        elif result.exit_blocked:
+            status = "UNSOLVABLE (exit is inside a wall)"
+        elif result.exhausted:
+            status = "gave up (node limit)"
+        else:
+            status = "UNSOLVABLE"
+        print(f"Level {i + 1}: {status}, collectibles {len(result.collected)}/{result.total_collectibles}, "
+              f"exit {'reached' if result.reached_exit else 'not reached'}, "
+              f"{result.nodes} nodes in {result.elapsed:.2f}s")
+        all_solved = all_solved and result.solved
+    print(f"Total {time.perf_counter() - start:.2f}s")
+    sys.exit(0 if all_solved else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pygame
 import sys
 import os
+import io
 import math
 import random
 from enum import Enum
@@ -11,19 +12,26 @@ pygame.mixer.init()
 
 # Import game modules
 from game_engine import (
-    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TILE_SIZE, GameState,
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, FIXED_DT, TILE_SIZE, GameState,
     Dimension, Button, TextEffect, Camera, ParallaxBackground,
-    SaveSystem, load_image, load_sound
+    SaveSystem, FixedTimestep, BackgroundCache, AssetPrefetcher,
+    load_image, load_sound, decode_image, read_file,
+    get_font, render_text
 )
 from game_objects import Player, Wall, Platform, DimensionPortal, Collectible
 from level_manager import LevelManager
 from customization import CustomizationMenu
+from simulation import Simulation, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+from replay import InputRecording
 
 # Create assets directories if they don't exist
 os.makedirs("assets/images", exist_ok=True)
 os.makedirs("assets/sounds", exist_ok=True)
 os.makedirs("assets/fonts", exist_ok=True)
 
+# Input recordings of the latest attempt at each level
+REPLAY_DIR = "replays"
+
 class Game:
     def __init__(self):
         # Set up display
@@ -32,9 +40,9 @@ class Game:
         self.clock = pygame.time.Clock()
         
         # Load fonts
-        self.font_large = pygame.font.SysFont(None, 64)
-        self.font_medium = pygame.font.SysFont(None, 36)
-        self.font_small = pygame.font.SysFont(None, 24)
+        self.font_large = get_font(64)
+        self.font_medium = get_font(36)
+        self.font_small = get_font(24)
         
         # Load sounds
         self.menu_sound = load_sound("menu_select.wav")
@@ -46,6 +54,9 @@ class Game:
         self.game_state = GameState.MAIN_MENU
         self.level_manager = LevelManager()
         self.player = None
+        self.simulation = None
+        self.input_bits = 0  # Held controls, applied once per simulation step
+        self.recording = None
         self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
         self.text_effects = []
         self.message_timer = 0
@@ -57,6 +68,8 @@ class Game:
         # Background and character settings
         self.current_bg_style = "default"
         self.current_character = "default"
+        self.background_cache = BackgroundCache()
+        self.prefetcher = AssetPrefetcher()  # Loads the next level's assets during play
         
         # Game enhancement attributes
         self.difficulty_level = 1  # 1=Easy, 2=Medium, 3=Hard
@@ -135,7 +148,7 @@ class Game:
         self.screen.fill((20, 20, 50))
         # Draw title
         title_text = "Game Controls"
-        title_surf = self.font_large.render(title_text, True, (255, 255, 255))
+        title_surf = render_text(self.font_large, title_text, (255, 255, 255))
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 50))
         controls_info = [
             "Movement Controls:",
@@ -162,9 +175,9 @@ class Game:
                 y_offset += 10
                 continue
             if ":" in text and text[-1] == ":":
-                text_surf = self.font_medium.render(text, True, (255, 255, 100))
+                text_surf = render_text(self.font_medium, text, (255, 255, 100))
             else:
-                text_surf = self.font_small.render(text, True, (255, 255, 255))
+                text_surf = render_text(self.font_small, text, (255, 255, 255))
             self.screen.blit(text_surf, (SCREEN_WIDTH//2 - text_surf.get_width()//2, y_offset))
             y_offset += 30
         # Draw back button
@@ -196,42 +209,89 @@ class Game:
     
     def count_total_collectibles(self):
         self.total_items = 0
-        for level in self.level_manager.levels:
-            self.total_items += len(level.collectibles)
+        for descriptor in self.level_manager.level_descriptors:
+            self.total_items += descriptor.collectible_count
     
     def start_game(self):
         self.game_state = GameState.PLAYING
         self.level_manager.current_level = 0
+        self.prefetcher.clear()
         self.init_level()
         self.total_score = 0
         self.collected_items = 0
         
         # Change music to level music
+        self.play_level_music()
+    
+    def play_level_music(self):
+        current_level = self.level_manager.get_current_level()
+        music_data = self.prefetcher.take(("music", current_level.music_path))
+        if music_data:
+            try:
+                pygame.mixer.music.load(io.BytesIO(music_data), os.path.splitext(current_level.music_path)[1][1:])
+                pygame.mixer.music.play(-1)
+                return
+            except pygame.error as e:
+                print(f"Failed to play prefetched music, loading it from file: {e}")
         try:
-            current_level = self.level_manager.get_current_level()
             if current_level.music_path and os.path.exists(current_level.music_path):
                 pygame.mixer.music.load(current_level.music_path)
                 pygame.mixer.music.play(-1)
         except:
             pass
     
+    def prefetch_next_level(self):
+        # Decode the next level's background and read its music on the loader thread.
+        # End portals come from the tile atlas, so there is nothing to prefetch for them.
+        next_index = self.level_manager.current_level + 1
+        if next_index >= len(self.level_manager.levels):
+            return
+        bg_path = self.background_cache.get_path(self.current_bg_style, next_index)
+        # The per-level background is only drawn when there is no parallax background
+        if self.background is None and os.path.exists(bg_path):
+            self.prefetcher.request(("background", self.current_bg_style, next_index),
+                                    decode_image, bg_path, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Same path the level will play from, so play_level_music finds the prefetched data
+        music_path = self.level_manager.level_descriptors[next_index].music_path
+        if music_path and os.path.exists(music_path):
+            self.prefetcher.request(("music", music_path), read_file, music_path)
+    
+    def apply_prefetched_assets(self):
+        # Only the cheap convert step happens here; decoding was done on the loader thread
+        level_index = self.level_manager.current_level
+        background = self.prefetcher.take(("background", self.current_bg_style, level_index))
+        if background:
+            self.background_cache.store(self.current_bg_style, level_index, background.convert())
+    
     def init_level(self):
+        # Restore the level's starting state; with the level's seed this attempt can be replayed
+        self.level_manager.reset_level()
         current_level = self.level_manager.get_current_level()
-        self.player = Player(*current_level.start_pos)
+        self.recording = InputRecording(self.level_manager.current_level, current_level.seed)
         
-        # Set character type
-        self.player.character_type = self.current_character
-        self.player.load_animations()
+        self.player = Player(*current_level.start_pos, self.current_character)
         
-        # Set ethereal objects for player
-        self.player.ethereal_objects = []
-        for wall in current_level.ethereal_walls:
-            self.player.ethereal_objects.append(wall)
+        # The simulation shares the level's walls and spatial hash with the player
+        self.simulation = Simulation(current_level, self.player)
         
-        # Set metal objects for player
-        self.player.metal_objects = []
-        for wall in current_level.metal_walls:
-            self.player.metal_objects.append(wall)
+        # Start loading the next level while this one is played
+        self.prefetch_next_level()
+    
+    def retry_level(self):
+        # Items picked up during the failed attempt don't count
+        current_level = self.level_manager.get_current_level()
+        self.collected_items -= len(current_level.initial_state['collectibles']) - len(current_level.collectibles)
+        self.text_effects = []
+        self.init_level()
+        self.game_state = GameState.PLAYING
+    
+    def save_recording(self):
+        self.recording.finish(self.player)
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            self.recording.save(os.path.join(REPLAY_DIR, f"level_{self.recording.level_index + 1}.dspr"))
+        except OSError as e:
+            print(f"Failed to save replay: {e}")
     
     def handle_events(self):
         for event in pygame.event.get():
@@ -244,9 +304,10 @@ class Game:
                 if character:
                     self.current_character = character
                     if self.player:
-                        self.player.character_type = character
-                        self.player.load_animations()
+                        self.player.change_character(character)
                 if bg_style:
+                    if bg_style != self.current_bg_style:
+                        self.background_cache.invalidate_style(self.current_bg_style)
                     self.current_bg_style = bg_style
                     self.load_background()
                 if action == "back":
@@ -276,6 +337,8 @@ class Game:
                             pass
                     elif self.game_state == GameState.TUTORIAL:
                         self.game_state = GameState.MAIN_MENU
+                elif event.key == pygame.K_r and self.game_state == GameState.GAME_OVER:
+                    self.retry_level()
                 if event.key == pygame.K_F3:
                     self.show_fps = not self.show_fps
                 if event.key == pygame.K_F11:
@@ -366,15 +429,16 @@ class Game:
                             self.menu_sound.play()
                             self.game_state = GameState.MAIN_MENU
 
-        # Handle player controls when playing
+        # Sample player controls when playing; the simulation applies them each step
+        self.input_bits = 0
         if self.game_state == GameState.PLAYING:
             keys = pygame.key.get_pressed()
             if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                self.player.move_left()
+                self.input_bits |= INPUT_LEFT
             if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                self.player.move_right()
-            if (keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]) and self.player.can_jump:
-                self.player.jump()
+                self.input_bits |= INPUT_RIGHT
+            if keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]:
+                self.input_bits |= INPUT_JUMP
         
         # Update button hover states
         mouse_pos = pygame.mouse.get_pos()
@@ -406,30 +470,18 @@ class Game:
     
     def update(self):
         if self.game_state == GameState.PLAYING:
-            current_level = self.level_manager.get_current_level()
-            
-            # Update level elements
-            current_level.update()
-            
-            # Update player
-            old_score = self.player.score
-            old_collectibles = len(current_level.collectibles)
-            
-            self.player.update(
-                current_level.walls, 
-                current_level.platforms + current_level.moving_platforms, 
-                current_level.dimension_portals, 
-                current_level.collectibles,
-                current_level.hazards,
-                current_level.powerups
-            )
+            # Advance the simulation by one fixed step
+            self.recording.record(self.input_bits)
+            state = self.simulation.step(self.input_bits)
+            if state != GameState.PLAYING:
+                self.save_recording()
             
             # Check if player collected items
-            if len(current_level.collectibles) < old_collectibles:
-                self.collected_items += old_collectibles - len(current_level.collectibles)
+            if self.simulation.collected > 0:
+                self.collected_items += self.simulation.collected
                 
                 # Create text effect for score
-                score_gained = self.player.score - old_score
+                score_gained = self.simulation.score_gained
                 if score_gained > 0:
                     self.text_effects.append(
                         TextEffect(f"+{score_gained}", 
@@ -442,16 +494,15 @@ class Game:
             self.camera.update(self.player.x + self.player.width // 2, 
                               self.player.y + self.player.height // 2)
             
-            # Check if player reached the end
-            if pygame.Rect(self.player.x, self.player.y, self.player.width, self.player.height).colliderect(current_level.end_rect):
-                if len(current_level.collectibles) == 0:  # All collectibles must be collected
-                    self.game_state = GameState.LEVEL_COMPLETE
-                    self.message_timer = 180  # Show message for 3 seconds
-                    self.level_complete_sound.play()
-                    self.total_score += self.player.score
+            # Check if player reached the end (all collectibles must be collected)
+            if state == GameState.LEVEL_COMPLETE:
+                self.game_state = GameState.LEVEL_COMPLETE
+                self.message_timer = 180  # Show message for 3 seconds
+                self.level_complete_sound.play()
+                self.total_score += self.player.score
             
             # Check if player died
-            if self.player.health <= 0 or self.player.y > SCREEN_HEIGHT + 100 or self.player.y < -100:
+            elif state == GameState.GAME_OVER:
                 self.game_state = GameState.GAME_OVER
                 self.message_timer = 180
                 self.game_over_sound.play()
@@ -465,14 +516,14 @@ class Game:
         if self.message_timer > 0:
             self.message_timer -= 1
     
-    def draw(self):
+    def draw(self, alpha=1.0):
         self.screen.fill((0, 0, 0))
         
         # Draw appropriate screen based on game state
         if self.game_state == GameState.MAIN_MENU:
             self.draw_main_menu()
         elif self.game_state == GameState.PLAYING:
-            self.draw_game()
+            self.draw_game(alpha)
         elif self.game_state == GameState.PAUSED:
             self.draw_game()  # Draw game in background
             self.draw_pause_menu()
@@ -501,7 +552,7 @@ class Game:
         if self.show_fps:
             fps = int(self.clock.get_fps())
             fps_text = f"FPS: {fps}"
-            fps_surf = self.font_small.render(fps_text, True, (255, 255, 0))
+            fps_surf = render_text(self.font_small, fps_text, (255, 255, 0))
             self.screen.blit(fps_surf, (SCREEN_WIDTH - fps_surf.get_width() - 10, 10))
         
         pygame.display.flip()
@@ -518,7 +569,7 @@ class Game:
         
         # Draw title
         title_text = "Dimensional Shift Puzzle"
-        title_surf = self.font_large.render(title_text, True, (255, 255, 255))
+        title_surf = render_text(self.font_large, title_text, (255, 255, 255))
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 80))
         
         # Draw buttons
@@ -527,13 +578,13 @@ class Game:
         
         # Draw version and credits
         version_text = "Version 1.0"
-        version_surf = self.font_small.render(version_text, True, (200, 200, 200))
+        version_surf = render_text(self.font_small, version_text, (200, 200, 200))
         self.screen.blit(version_surf, (10, SCREEN_HEIGHT - 30))
     
     def draw_settings(self):
         self.screen.fill((30, 40, 60))
         title_text = "Game Settings"
-        title_surf = self.font_large.render(title_text, True, (255, 255, 255))
+        title_surf = render_text(self.font_large, title_text, (255, 255, 255))
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 80))
 
         descriptions = [
@@ -547,14 +598,14 @@ class Game:
         for i, button in enumerate(self.settings_buttons):
             # Draw description above the first 5 buttons
             if i < len(descriptions):
-                desc_surf = self.font_small.render(descriptions[i], True, (200, 200, 200))
+                desc_surf = render_text(self.font_small, descriptions[i], (200, 200, 200))
                 desc_y = button.rect.top - desc_surf.get_height() - 4
                 self.screen.blit(desc_surf, (SCREEN_WIDTH//2 - desc_surf.get_width()//2, desc_y))
             button.draw(self.screen)
 
         # Draw keyboard shortcuts at the bottom
         shortcuts_text = "Keyboard Shortcuts: F3 - Toggle FPS, F11 - Toggle Fullscreen"
-        shortcuts_surf = self.font_small.render(shortcuts_text, True, (200, 200, 200))
+        shortcuts_surf = render_text(self.font_small, shortcuts_text, (200, 200, 200))
         self.screen.blit(shortcuts_surf, (SCREEN_WIDTH//2 - shortcuts_surf.get_width()//2, SCREEN_HEIGHT - 40))
     
     def draw_credits(self):
@@ -563,7 +614,7 @@ class Game:
         
         # Draw title
         title_text = "Credits"
-        title_surf = self.font_large.render(title_text, True, (255, 255, 255))
+        title_surf = render_text(self.font_large, title_text, (255, 255, 255))
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 50))
         
         # Draw credits information
@@ -597,16 +648,16 @@ class Game:
                 
             if ":" in text and text[-1] == ":":
                 # Section header
-                text_surf = self.font_medium.render(text, True, (255, 200, 100))
+                text_surf = render_text(self.font_medium, text, (255, 200, 100))
             elif text == credits_info[0]:
                 # Game title
-                text_surf = self.font_medium.render(text, True, (100, 200, 255))
+                text_surf = render_text(self.font_medium, text, (100, 200, 255))
             elif text == credits_info[-1]:
                 # Copyright
-                text_surf = self.font_small.render(text, True, (200, 200, 200))
+                text_surf = render_text(self.font_small, text, (200, 200, 200))
             else:
                 # Regular text
-                text_surf = self.font_small.render(text, True, (255, 255, 255))
+                text_surf = render_text(self.font_small, text, (255, 255, 255))
                 
             self.screen.blit(text_surf, (SCREEN_WIDTH//2 - text_surf.get_width()//2, y_offset))
             y_offset += 30
@@ -615,7 +666,7 @@ class Game:
         for button in self.credits_buttons:
             button.draw(self.screen)
     
-    def draw_game(self):
+    def draw_game(self, alpha=1.0):
         current_level = self.level_manager.get_current_level()
         
         # Draw background
@@ -625,32 +676,16 @@ class Game:
             # Always draw a base color first
             self.screen.fill((0, 0, 50))  # Dark blue background
             
-            # Try to load level-specific background
-            try:
-                import os
-                base_path = os.path.dirname(os.path.abspath(__file__))
-                
-                # Try style-specific background first
-                if self.current_bg_style != "default":
-                    bg_path = os.path.join(base_path, "assets", "images", 
-                                         f"background_{self.current_bg_style}_{self.level_manager.current_level + 1}.png")
-                else:
-                    bg_path = os.path.join(base_path, "assets", "images", 
-                                         f"background_{self.level_manager.current_level + 1}.png")
-                
-                if os.path.exists(bg_path):
-                    print(f"Loading level background: {bg_path}")
-                    bg_image = pygame.image.load(bg_path)
-                    bg_image = pygame.transform.scale(bg_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-                    self.screen.blit(bg_image, (0, 0))
-            except Exception as e:
-                print(f"Failed to load level background: {e}")
-        
-        # Draw level
-        current_level.draw(self.screen, self.camera)
+            # Level-specific background, loaded once and cached per style and level
+            bg_image = self.background_cache.get(self.current_bg_style, self.level_manager.current_level)
+            if bg_image:
+                self.screen.blit(bg_image, (0, 0))
         
-        # Draw player
-        self.player.draw(self.screen, self.camera)
+        # Draw the level and player between the last two simulation states,
+        # seen through a camera interpolated the same way
+        camera = self.camera.interpolated(alpha)
+        current_level.draw(self.screen, camera, alpha)
+        self.player.draw(self.screen, camera, alpha)
         
         # Draw text effects
         for effect in self.text_effects:
@@ -662,7 +697,7 @@ class Game:
     def draw_ui(self):
         # Draw current dimension
         dimension_text = f"Dimension: {self.player.dimension.name}"
-        dimension_surf = self.font_small.render(dimension_text, True, (255, 255, 255))
+        dimension_surf = render_text(self.font_small, dimension_text, (255, 255, 255))
         self.screen.blit(dimension_surf, (10, 10))
         
         # Draw health bar
@@ -677,35 +712,35 @@ class Game:
         pygame.draw.rect(self.screen, (255, 255, 255), (health_x, health_y, health_width, health_height), 1)
         
         health_text = f"Health: {self.player.health}/{self.player.max_health}"
-        health_surf = self.font_small.render(health_text, True, (255, 255, 255))
+        health_surf = render_text(self.font_small, health_text, (255, 255, 255))
         self.screen.blit(health_surf, (health_x + health_width + 10, health_y))
         
         # Draw collectibles count
         current_level = self.level_manager.get_current_level()
         collectibles_text = f"Collectibles: {len(current_level.collectibles)} remaining"
-        collectibles_surf = self.font_small.render(collectibles_text, True, (255, 255, 255))
+        collectibles_surf = render_text(self.font_small, collectibles_text, (255, 255, 255))
         self.screen.blit(collectibles_surf, (10, 70))
         
         # Draw score
         score_text = f"Score: {self.player.score}"
-        score_surf = self.font_small.render(score_text, True, (255, 255, 255))
+        score_surf = render_text(self.font_small, score_text, (255, 255, 255))
         self.screen.blit(score_surf, (10, 100))
         
         # Draw level number
         level_text = f"Level: {self.level_manager.current_level + 1}/{len(self.level_manager.levels)}"
-        level_surf = self.font_small.render(level_text, True, (255, 255, 255))
+        level_surf = render_text(self.font_small, level_text, (255, 255, 255))
         self.screen.blit(level_surf, (SCREEN_WIDTH - level_surf.get_width() - 10, 40))
         
         # Draw difficulty level if not on easy
         if self.difficulty_level > 1:
             difficulty_names = ["", "Easy", "Medium", "Hard"]
             diff_text = f"Difficulty: {difficulty_names[self.difficulty_level]}"
-            diff_surf = self.font_small.render(diff_text, True, (255, 200, 100))
+            diff_surf = render_text(self.font_small, diff_text, (255, 200, 100))
             self.screen.blit(diff_surf, (SCREEN_WIDTH - diff_surf.get_width() - 10, 70))
         
         # Draw controls reminder
         controls_text = "Controls: Arrow Keys/WASD to move, SPACE to jump, ESC to pause"
-        controls_surf = self.font_small.render(controls_text, True, (200, 200, 200))
+        controls_surf = render_text(self.font_small, controls_text, (200, 200, 200))
         self.screen.blit(controls_surf, (SCREEN_WIDTH//2 - controls_surf.get_width()//2, SCREEN_HEIGHT - 30))
     
     def draw_pause_menu(self):
@@ -716,7 +751,7 @@ class Game:
         
         # Draw pause title
         pause_text = "Game Paused"
-        pause_surf = self.font_large.render(pause_text, True, (255, 255, 255))
+        pause_surf = render_text(self.font_large, pause_text, (255, 255, 255))
         self.screen.blit(pause_surf, (SCREEN_WIDTH//2 - pause_surf.get_width()//2, 100))
         
         # Draw buttons
@@ -731,12 +766,12 @@ class Game:
         
         # Draw level complete message
         complete_text = "Level Complete!"
-        complete_surf = self.font_large.render(complete_text, True, (255, 255, 255))
+        complete_surf = render_text(self.font_large, complete_text, (255, 255, 255))
         self.screen.blit(complete_surf, (SCREEN_WIDTH//2 - complete_surf.get_width()//2, 100))
         
         # Draw score
         score_text = f"Score: {self.player.score}"
-        score_surf = self.font_medium.render(score_text, True, (255, 255, 255))
+        score_surf = render_text(self.font_medium, score_text, (255, 255, 255))
         self.screen.blit(score_surf, (SCREEN_WIDTH//2 - score_surf.get_width()//2, 180))
         
         # Draw continue message
@@ -747,7 +782,7 @@ class Game:
             self.game_state = GameState.GAME_COMPLETE
             self.game_complete_sound.play()
             
-        continue_surf = self.font_medium.render(continue_text, True, (255, 255, 255))
+        continue_surf = render_text(self.font_medium, continue_text, (255, 255, 255))
         self.screen.blit(continue_surf, (SCREEN_WIDTH//2 - continue_surf.get_width()//2, 250))
     
     def draw_game_over(self):
@@ -758,18 +793,22 @@ class Game:
         
         # Draw game over message
         over_text = "Game Over"
-        over_surf = self.font_large.render(over_text, True, (255, 0, 0))
+        over_surf = render_text(self.font_large, over_text, (255, 0, 0))
         self.screen.blit(over_surf, (SCREEN_WIDTH//2 - over_surf.get_width()//2, 100))
         
         # Draw score
         score_text = f"Final Score: {self.total_score + self.player.score}"
-        score_surf = self.font_medium.render(score_text, True, (255, 255, 255))
+        score_surf = render_text(self.font_medium, score_text, (255, 255, 255))
         self.screen.blit(score_surf, (SCREEN_WIDTH//2 - score_surf.get_width()//2, 180))
         
         # Draw continue message
         continue_text = "Press SPACE to return to main menu"
-        continue_surf = self.font_medium.render(continue_text, True, (255, 255, 255))
+        continue_surf = render_text(self.font_medium, continue_text, (255, 255, 255))
         self.screen.blit(continue_surf, (SCREEN_WIDTH//2 - continue_surf.get_width()//2, 250))
+        
+        retry_text = "Press R to retry the level"
+        retry_surf = render_text(self.font_medium, retry_text, (255, 255, 255))
+        self.screen.blit(retry_surf, (SCREEN_WIDTH//2 - retry_surf.get_width()//2, 290))
     
     def draw_game_complete(self):
         # Draw background
@@ -783,27 +822,27 @@ class Game:
         
         # Draw completion message
         complete_text = "Congratulations!"
-        complete_surf = self.font_large.render(complete_text, True, (255, 255, 0))
+        complete_surf = render_text(self.font_large, complete_text, (255, 255, 0))
         self.screen.blit(complete_surf, (SCREEN_WIDTH//2 - complete_surf.get_width()//2, 100))
         
         # Draw secondary message
         secondary_text = "You have completed all levels!"
-        secondary_surf = self.font_medium.render(secondary_text, True, (255, 255, 255))
+        secondary_surf = render_text(self.font_medium, secondary_text, (255, 255, 255))
         self.screen.blit(secondary_surf, (SCREEN_WIDTH//2 - secondary_surf.get_width()//2, 170))
         
         # Draw score
         score_text = f"Final Score: {self.total_score + self.player.score}"
-        score_surf = self.font_medium.render(score_text, True, (255, 255, 255))
+        score_surf = render_text(self.font_medium, score_text, (255, 255, 255))
         self.screen.blit(score_surf, (SCREEN_WIDTH//2 - score_surf.get_width()//2, 220))
         
         # Draw collectibles
         collectibles_text = f"Collectibles: {self.collected_items}/{self.total_items}"
-        collectibles_surf = self.font_medium.render(collectibles_text, True, (255, 255, 255))
+        collectibles_surf = render_text(self.font_medium, collectibles_text, (255, 255, 255))
         self.screen.blit(collectibles_surf, (SCREEN_WIDTH//2 - collectibles_surf.get_width()//2, 270))
         
         # Draw continue message
         continue_text = "Press SPACE to return to main menu"
-        continue_surf = self.font_medium.render(continue_text, True, (255, 255, 255))
+        continue_surf = render_text(self.font_medium, continue_text, (255, 255, 255))
         self.screen.blit(continue_surf, (SCREEN_WIDTH//2 - continue_surf.get_width()//2, 350))
     
     def draw_tutorial(self):
@@ -812,7 +851,7 @@ class Game:
         
         # Draw title
         title_text = "How to Play"
-        title_surf = self.font_large.render(title_text, True, (255, 255, 255))
+        title_surf = render_text(self.font_large, title_text, (255, 255, 255))
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 50))
         
         # Draw tutorial text
@@ -838,7 +877,7 @@ class Game:
         
         y_offset = 120
         for text in tutorial_texts:
-            text_surf = self.font_medium.render(text, True, (255, 255, 255))
+            text_surf = render_text(self.font_medium, text, (255, 255, 255))
             self.screen.blit(text_surf, (SCREEN_WIDTH//2 - text_surf.get_width()//2, y_offset))
             y_offset += 30
         # Draw Back button
@@ -847,28 +886,29 @@ class Game:
 
     def next_level(self):
         if self.level_manager.next_level():
-            self.init_level()
-            self.game_state = GameState.PLAYING
+            self.apply_prefetched_assets()
             
             # Change music to level music
-            try:
-                current_level = self.level_manager.get_current_level()
-                if current_level.music_path and os.path.exists(current_level.music_path):
-                    pygame.mixer.music.load(current_level.music_path)
-                    pygame.mixer.music.play(-1)
-            except:
-                pass
+            self.play_level_music()
+            
+            # Anything else that was prefetched is for a level we're not on anymore
+            self.prefetcher.clear()
+            self.init_level()
+            self.game_state = GameState.PLAYING
         else:
             self.game_state = GameState.GAME_COMPLETE
             self.game_complete_sound.play()
     
     def run(self):
+        # Simulation runs on a fixed step; rendering runs as fast as FPS allows
+        timestep = FixedTimestep(FIXED_DT)
         running = True
         while running:
+            frame_time = self.clock.tick(FPS) / 1000.0
             running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            for _ in range(timestep.advance(frame_time)):
+                self.update()
+            self.draw(timestep.alpha)
 
 # Main function
 def main():
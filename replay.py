@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import struct
+import zlib
+
+if __name__ == "__main__":
+    # Run without a window or audio device
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from game_engine import FIXED_DT, set_headless
+from simulation import Simulation
+
+# Per-tick input stream for one level attempt, plus the state it ended in
+class InputRecording:
+    MAGIC = b"DSPR"
+    VERSION = 2  # Bumped whenever simulation results can change; older replays won't verify
+    # magic, version, level index, seed, ticks, final x, final y, score, health
+    HEADER = struct.Struct("<4sHHIIddii")
+
+    def __init__(self, level_index, seed):
+        self.level_index = level_index
+        self.seed = seed
+        self.inputs = bytearray()  # One byte of INPUT_* bits per simulation step
+        self.final_state = None    # (x, y, score, health) when the recording stopped
+
+    def record(self, input_bits):
+        self.inputs.append(input_bits)
+
+    def finish(self, player):
+        self.final_state = (player.x, player.y, player.score, player.health)
+
+    def save(self, path):
+        x, y, score, health = self.final_state
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.level_index, self.seed,
+                                  len(self.inputs), x, y, score, health)
+        with open(path, 'wb') as f:
+            f.write(header)
+            # Held keys repeat for many ticks, so the stream compresses very well
+            f.write(zlib.compress(bytes(self.inputs), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, level_index, seed, ticks, x, y, score, health = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"Not a replay file: {path}")
+        recording = cls(level_index, seed)
+        recording.inputs = bytearray(zlib.decompress(data[cls.HEADER.size:]))
+        if len(recording.inputs) != ticks:
+            raise ValueError(f"Replay file is truncated: {path}")
+        recording.final_state = (x, y, score, health)
+        return recording
+
+def replay(recording, level_manager):
+    # Re-run a recording on a freshly built level; returns (matches, simulation)
+    level = level_manager.build_level(recording.level_index, recording.seed)
+    simulation = Simulation(level)
+    for input_bits in recording.inputs:
+        simulation.step(input_bits)
+    player = simulation.player
+    final_state = (player.x, player.y, player.score, player.health)
+    return final_state == recording.final_state, simulation
+
+def main():
+    set_headless(True)
+    from level_manager import LevelManager
+    level_manager = LevelManager()
+    all_match = True
+    for path in sys.argv[1:]:
+        recording = InputRecording.load(path)
+        start = time.perf_counter()
+        matches, simulation = replay(recording, level_manager)
+        elapsed = time.perf_counter() - start
+        speedup = len(recording.inputs) * FIXED_DT / elapsed if elapsed > 0 else 0
+        player = simulation.player
+        result = "OK" if matches else "MISMATCH"
+        print(f"{path}: level {recording.level_index + 1}, {len(recording.inputs)} ticks, "
+              f"{simulation.state.name}, {result} ({speedup:.0f}x real time)")
+        if not matches:
+            print(f"  recorded {recording.final_state}")
+            print(f"  replayed {(player.x, player.y, player.score, player.health)}")
+            all_match = False
+    sys.exit(0 if all_match else 1)
+
+if __name__ == "__main__":
+    main()
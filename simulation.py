@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    # Run without a window or audio device
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from game_engine import SCREEN_WIDTH, SCREEN_HEIGHT, GameState, set_headless
+from game_objects import Player
+
+# Input bits for one simulation step
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+
+# Simulation core: player physics, level updates and win/lose checks, one call per FIXED_DT step
+class Simulation:
+    def __init__(self, level, player=None):
+        self.level = level
+        self.player = player if player else Player(*level.start_pos)
+        self.player.ethereal_objects = level.ethereal_walls
+        self.player.metal_objects = level.metal_walls
+        self.player.spatial_index = level.spatial_index
+        self.player.particle_system.seed(level.rng.getrandbits(32))
+        # Platforms are never added or removed, so the combined list is built once
+        self.platforms = level.platforms + level.moving_platforms
+        self.walls = level.wall_colliders if level.wall_colliders is not None else level.walls
+        # Objects further than this from the player are off camera and don't animate
+        self.active_rect = pygame.Rect(0, 0, SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2)
+        # Falling this far below the level (or the screen, for short levels) is death
+        self.kill_y = max(level.height, SCREEN_HEIGHT) + 100
+        self.state = GameState.PLAYING
+        self.tick = 0
+        self.collected = 0      # Collectibles picked up during the last step
+        self.score_gained = 0   # Score gained during the last step
+
+    def apply_inputs(self, inputs):
+        if inputs & INPUT_LEFT:
+            self.player.move_left()
+        if inputs & INPUT_RIGHT:
+            self.player.move_right()
+        if inputs & INPUT_JUMP and self.player.can_jump:
+            self.player.jump()
+
+    def step(self, inputs=0):
+        if self.state != GameState.PLAYING:
+            return self.state
+        level = self.level
+        player = self.player
+
+        self.apply_inputs(inputs)
+        self.active_rect.center = (player.x + player.width // 2, player.y + player.height // 2)
+        level.update(self.active_rect)
+
+        old_score = player.score
+        old_collectibles = len(level.collectibles)
+        player.update(
+            self.walls,
+            self.platforms,
+            level.dimension_portals,
+            level.collectibles,
+            level.hazards,
+            level.powerups
+        )
+        self.collected = old_collectibles - len(level.collectibles)
+        self.score_gained = player.score - old_score
+
+        # Reaching the exit only counts once every collectible is gone
+        player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
+        if player_rect.colliderect(level.end_rect) and len(level.collectibles) == 0:
+            self.state = GameState.LEVEL_COMPLETE
+        if player.health <= 0 or player.y > self.kill_y or player.y < -100:
+            self.state = GameState.GAME_OVER
+
+        self.tick += 1
+        return self.state
+
+    def run(self, inputs, max_ticks=None):
+        # Step through an input sequence until it runs out or the level ends
+        for inputs_bits in inputs:
+            if max_ticks is not None and self.tick >= max_ticks:
+                break
+            if self.step(inputs_bits) != GameState.PLAYING:
+                break
+        return self.state
+
+def main():
+    set_headless(True)
+    from level_manager import LevelManager
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    level_manager = LevelManager()
+    for i in range(len(level_manager.levels)):
+        simulation = Simulation(level_manager.get_level(i))
+        # Hold right and jump whenever possible
+        pattern = [INPUT_RIGHT | INPUT_JUMP] * ticks
+        start = time.perf_counter()
+        state = simulation.run(pattern)
+        elapsed = time.perf_counter() - start
+        rate = simulation.tick / elapsed if elapsed > 0 else 0
+        print(f"Level {i + 1}: {simulation.tick} ticks, {state.name}, {rate:.0f} ticks/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import numpy as np
+import pygame
+from game_engine import TILE_SIZE, tile_atlas, SpatialHash
+
+# Tile codes for static geometry; everything else in a layout is an entity
+EMPTY = 0
+WALL = 1
+ETHEREAL_WALL = 2
+METAL_WALL = 3
+PLATFORM = 4
+
+# Layout character -> tile code
+TILE_CHARS = {'#': WALL, 'X': ETHEREAL_WALL, 'W': METAL_WALL, 'P': PLATFORM}
+# Layout characters that need their own object (per-instance state like timers or pickups)
+ENTITY_CHARS = "MHNIETGCDSJV"
+
+# Per tile code: image name, height, fallback color
+TILE_INFO = {
+    WALL: ("wall.png", TILE_SIZE, (255, 255, 255)),
+    ETHEREAL_WALL: ("wall.png", TILE_SIZE, (200, 200, 200)),
+    METAL_WALL: ("metal_wall.png", TILE_SIZE, (192, 192, 192)),
+    PLATFORM: ("platform.png", 10, (0, 255, 0)),
+}
+
+# Lookup tables indexed by raw layout bytes or tile codes
+CHAR_TO_CODE = np.zeros(256, dtype=np.uint8)
+for char, code in TILE_CHARS.items():
+    CHAR_TO_CODE[ord(char)] = code
+IS_ENTITY = np.zeros(256, dtype=bool)
+for char in ENTITY_CHARS:
+    IS_ENTITY[ord(char)] = True
+IS_WALL = np.zeros(256, dtype=bool)
+IS_WALL[[WALL, ETHEREAL_WALL, METAL_WALL]] = True
+IS_PLATFORM = np.zeros(256, dtype=bool)
+IS_PLATFORM[PLATFORM] = True
+
+ENTITY_DTYPE = np.dtype([('char', 'u1'), ('x', 'i4'), ('y', 'i4')])
+
+# Throwaway stand-in for a wall or platform returned by TileGrid.query
+class Tile:
+    __slots__ = ("rect", "code", "is_ethereal", "is_metal")
+
+    def __init__(self, code, x, y):
+        self.rect = pygame.Rect(x, y, TILE_SIZE, TILE_INFO[code][1])
+        self.code = code
+        self.is_ethereal = code == ETHEREAL_WALL
+        self.is_metal = code == METAL_WALL
+
+# Compact level geometry: one byte per tile plus a typed array of entity cells.
+# Answers the same query() calls as SpatialHash; dynamic kinds go to a small hash.
+class TileGrid:
+    def __init__(self, layout):
+        self.rows = len(layout)
+        self.cols = max(len(row) for row in layout)
+        chars = np.full((self.rows, self.cols), ord(' '), dtype=np.uint8)
+        for y, row in enumerate(layout):
+            chars[y, :len(row)] = np.frombuffer(row.encode('latin-1'), dtype=np.uint8)
+        self.codes = CHAR_TO_CODE[chars]
+
+        # Entities in row-major order, matching the order the object parser creates them
+        ys, xs = np.nonzero(IS_ENTITY[chars])
+        self.entities = np.zeros(len(ys), dtype=ENTITY_DTYPE)
+        self.entities['char'] = chars[ys, xs]
+        self.entities['x'] = xs * TILE_SIZE
+        self.entities['y'] = ys * TILE_SIZE
+
+        self.kind_counts = {
+            "walls": int(np.count_nonzero(IS_WALL[self.codes])),
+            "platforms": int(np.count_nonzero(IS_PLATFORM[self.codes])),
+        }
+        self.tile_images = {}
+        for code, (image_name, height, color) in TILE_INFO.items():
+            try:
+                index = tile_atlas.get_index(image_name, TILE_SIZE, height)
+            except:
+                index = None
+            self.tile_images[code] = index
+        self.dynamic = SpatialHash(TILE_SIZE)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.entities.nbytes
+
+    def entity_cells(self):
+        # (layout char, x, y) for every cell that needs a rich object
+        for char, x, y in self.entities.tolist():
+            yield chr(char), x, y
+
+    def tiles(self, code):
+        ys, xs = np.nonzero(self.codes == code)
+        return [Tile(code, x * TILE_SIZE, y * TILE_SIZE) for y, x in zip(ys.tolist(), xs.tolist())]
+
+    def cell_window(self, rect):
+        left = max(rect.left // TILE_SIZE, 0)
+        top = max(rect.top // TILE_SIZE, 0)
+        right = min((rect.right - 1) // TILE_SIZE + 1, self.cols)
+        bottom = min((rect.bottom - 1) // TILE_SIZE + 1, self.rows)
+        return left, top, right, bottom
+
+    def query(self, rect, kind):
+        if kind == "walls":
+            mask = IS_WALL
+        elif kind == "platforms":
+            mask = IS_PLATFORM
+        else:
+            return self.dynamic.query(rect, kind)
+        left, top, right, bottom = self.cell_window(rect)
+        if left >= right or top >= bottom:
+            return []
+        window = self.codes[top:bottom, left:right]
+        found = []
+        # Row-major, like SpatialHash, so collisions resolve in the same order
+        ys, xs = np.nonzero(mask[window])
+        for y, x in zip(ys.tolist(), xs.tolist()):
+            tile = Tile(int(window[y, x]), (left + x) * TILE_SIZE, (top + y) * TILE_SIZE)
+            if tile.rect.colliderect(rect):
+                found.append(tile)
+        return found
+
+    def draw(self, screen, view):
+        # Blit the static tiles inside view, with view's top-left at the screen origin
+        left, top, right, bottom = self.cell_window(view)
+        if left >= right or top >= bottom:
+            return 0
+        window = self.codes[top:bottom, left:right]
+        ys, xs = np.nonzero(window)
+        codes = window[ys, xs].tolist()
+        xs = ((xs + left) * TILE_SIZE - view.x).tolist()
+        ys = ((ys + top) * TILE_SIZE - view.y).tolist()
+        images = {code: tile_atlas.get_surface(index) if index is not None else None
+                  for code, index in self.tile_images.items()}
+        blits = []
+        for code, x, y in zip(codes, xs, ys):
+            image = images[code]
+            if image:
+                blits.append((image, (x, y)))
+            else:
+                image_name, height, color = TILE_INFO[code]
+                pygame.draw.rect(screen, color, (x, y, TILE_SIZE, height))
+        if blits:
+            screen.blits(blits, False)
+        return len(codes)
+
+    # The rest of the SpatialHash interface only concerns dynamic objects
+    def insert(self, obj, kind):
+        self.dynamic.insert(obj, kind)
+
+    def remove(self, obj):
+        return self.dynamic.remove(obj)
+
+    def move(self, obj):
+        self.dynamic.move(obj)
+
+    def __contains__(self, obj):
+        return obj in self.dynamic
+
+    def count(self, kind):
+        if kind in self.kind_counts:
+            return self.kind_counts[kind]
+        return self.dynamic.count(kind)
+
+    def objects(self, kind):
+        return self.dynamic.objects(kind)
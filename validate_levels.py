@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Headless tool: never open a window or audio device, in the worker processes either
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from game_engine import FPS, TILE_SIZE, GameState, set_headless
+from level_files import LEVEL_DIR, LEVEL_EXTENSION, parse_level_text
+from level_manager import Level, tile_rects_cover
+from game_objects import Collider
+from level_solver import MAX_NODES, solve_level
+from simulation import Simulation
+
+SPAWN_CHECK_TICKS = FPS
+
+# Findings for one level file; plain data so it can come back from a worker process
+class LevelReport:
+    def __init__(self, path):
+        self.path = path
+        self.errors = []
+        self.warnings = []
+        self.load_time = 0.0    # Parsing the text and building the Level
+        self.solve_time = 0.0
+        self.nodes = 0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+def validate_file(path, max_nodes=MAX_NODES):
+    set_headless(True)
+    report = LevelReport(path)
+    start = time.perf_counter()
+    try:
+        with open(path, encoding='utf-8') as f:
+            level_file = parse_level_text(f.read(), path)
+        level = Level(level_file.layout, level_file.start_pos, level_file.end_pos)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        report.errors.append(f"parse error: {e}")
+        return report
+    report.load_time = time.perf_counter() - start
+
+    if not level_file.has_start:
+        report.errors.append("no start (S)")
+    if not level_file.has_end:
+        report.errors.append("no exit (E)")
+
+    # Merged wall blocks must collide exactly where the wall tiles are
+    if level.wall_colliders is not None:
+        cells = [(wall.rect.x // TILE_SIZE, wall.rect.y // TILE_SIZE)
+                 for wall in level.walls if not wall.is_ethereal and not wall.is_metal]
+        rects = [collider.rect for collider in level.wall_colliders if isinstance(collider, Collider)]
+        if not tile_rects_cover(cells, rects):
+            report.errors.append("merged wall colliders don't match the wall tiles")
+
+    # Standing still for a second after spawning must not hurt, e.g. spikes right under the start
+    simulation = Simulation(level)
+    simulation.run([0] * SPAWN_CHECK_TICKS)
+    if simulation.player.health < simulation.player.max_health or simulation.state == GameState.GAME_OVER:
+        report.errors.append("hazard on spawn")
+    level.reset()
+
+    result = solve_level(level, max_nodes=max_nodes)
+    report.solve_time = result.elapsed
+    report.nodes = result.nodes
+    unreachable = result.total_collectibles - len(result.collected)
+    if result.exhausted:
+        report.warnings.append(f"search gave up after {result.nodes} nodes")
+    elif unreachable:
+        report.errors.append(f"{unreachable} of {result.total_collectibles} collectibles unreachable")
+    if not result.solved and not result.exhausted and level_file.has_end:
+        report.errors.append("exit can't be reached with every collectible")
+    return report
+
+def collect_paths(targets):
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(os.path.join(target, name) for name in sorted(os.listdir(target))
+                         if name.endswith(LEVEL_EXTENSION))
+        else:
+            paths.append(target)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate level files in parallel")
+    parser.add_argument("targets", nargs="*", default=[LEVEL_DIR], help="level files or folders")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--max-nodes", type=int, default=MAX_NODES, help="solver search limit per level")
+    args = parser.parse_args()
+
+    paths = collect_paths(args.targets)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        reports = list(executor.map(validate_file, paths, [args.max_nodes] * len(paths)))
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for report in reports:
+        status = "OK" if report.ok else "FAIL"
+        print(f"{status:4} {report.path}  load {report.load_time * 1000:.1f}ms, "
+              f"solve {report.solve_time:.2f}s ({report.nodes} nodes)")
+        for error in report.errors:
+            print(f"     error: {error}")
+        for warning in report.warnings:
+            print(f"     warning: {warning}")
+        if not report.ok:
+            failed += 1
+
+    rate = len(reports) / elapsed if elapsed > 0 else 0
+    print(f"{len(reports)} levels, {failed} failed, {elapsed:.2f}s with {args.jobs} workers ({rate:.1f} levels/s)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()